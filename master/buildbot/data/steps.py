@@ -86,10 +86,10 @@ class StepsEndpoint(Db2DataMixin, base.BuildNestingMixin, base.Endpoint):
             if buildid is None:
                 return None
         steps = yield self.master.db.steps.getSteps(buildid=buildid)
-        results = []
-        for dbdict in steps:
-            results.append((yield self.db2data(dbdict)))
-        return results
+        results = yield defer.DeferredList(
+            [self.db2data(dbdict) for dbdict in steps],
+            consumeErrors=True, fireOnOneErrback=True)
+        return [r for (s, r) in results]
 
 
 class UrlEntityType(types.Entity):
@@ -37,9 +37,15 @@ class BuildersConnectorComponent(base.DBConnectorComponent):
     def updateBuilderInfo(self, builderid, description, description_format, description_html,
                           projectid, tags):
         # convert to tag IDs first, as necessary
+        tag_names = [tag for tag in tags if not isinstance(tag, type(1))]
+        tagids_by_name = yield self._getTagIds(tag_names)
+
+        # only the tags that do not exist yet need to be created
         def toTagid(tag):
             if isinstance(tag, type(1)):
                 return defer.succeed(tag)
+            if tag in tagids_by_name:
+                return defer.succeed(tagids_by_name[tag])
             ssConnector = self.master.db.tags
             return ssConnector.findTagId(tag)
 
@@ -57,24 +63,49 @@ class BuildersConnectorComponent(base.DBConnectorComponent):
                 whereclause=builders_tbl.c.id == builderid)
             conn.execute(q, description=description, description_format=description_format,
                          description_html=description_html, projectid=projectid).close()
-            # remove previous builders_tags
-            conn.execute(builders_tags_tbl.delete(
-                whereclause=((builders_tags_tbl.c.builderid == builderid)))).close()
 
-            # add tag ids
-            if tagsids:
+            # only touch the builders_tags that changed, usually none of them
+            q = sa.select([builders_tags_tbl.c.tagid],
+                          whereclause=builders_tags_tbl.c.builderid == builderid)
+            current_tagids = {row.tagid for row in conn.execute(q).fetchall()}
+            wanted_tagids = list(dict.fromkeys(tagsids))
+
+            stale_tagids = current_tagids.difference(wanted_tagids)
+            if stale_tagids:
+                conn.execute(builders_tags_tbl.delete(
+                    whereclause=((builders_tags_tbl.c.builderid == builderid) &
+                                 builders_tags_tbl.c.tagid.in_(stale_tagids)))).close()
+
+            new_tagids = [tagid for tagid in wanted_tagids if tagid not in current_tagids]
+            if new_tagids:
                 conn.execute(builders_tags_tbl.insert(), [
                     {
                         "builderid": builderid,
                         "tagid": tagid
                     }
-                    for tagid in tagsids
+                    for tagid in new_tagids
                 ]).close()
 
             transaction.commit()
 
         return (yield self.db.pool.do(thd))
 
+    # returns a Deferred that returns a dictionary of tag name -> tag id, for the tags in
+    # tag_names that already exist
+    def _getTagIds(self, tag_names):
+        if not tag_names:
+            return defer.succeed({})
+
+        names_by_hash = {self.hashColumns(name): name for name in tag_names}
+
+        def thd(conn):
+            tags_tbl = self.db.model.tags
+            q = sa.select([tags_tbl.c.id, tags_tbl.c.name_hash],
+                          whereclause=tags_tbl.c.name_hash.in_(list(names_by_hash)))
+            return {names_by_hash[row.name_hash]: row.id
+                    for row in conn.execute(q).fetchall()}
+        return self.db.pool.do(thd)
+
     def getBuilder(self, builderid):
         d = self.getBuilders(_builderid=builderid)
 
@@ -144,6 +175,15 @@ class BuildersConnectorComponent(base.DBConnectorComponent):
             bldr_id_to_tags = defaultdict(list)
             bldr_q = sa.select([builders_tags_tbl.c.builderid, tags_tbl.c.name])
             bldr_q = bldr_q.select_from(tags_tbl.join(builders_tags_tbl))
+            # only fetch the tags of the builders that are returned
+            if masterid is not None:
+                bldr_q = bldr_q.where(builders_tags_tbl.c.builderid.in_(
+                    sa.select([bm_tbl.c.builderid]).where(bm_tbl.c.masterid == masterid)))
+            if projectid is not None:
+                bldr_q = bldr_q.where(builders_tags_tbl.c.builderid.in_(
+                    sa.select([bldr_tbl.c.id]).where(bldr_tbl.c.projectid == projectid)))
+            if _builderid is not None:
+                bldr_q = bldr_q.where(builders_tags_tbl.c.builderid == _builderid)
 
             for bldr_id, tag in conn.execute(bldr_q).fetchall():
                 bldr_id_to_tags[bldr_id].append(tag)
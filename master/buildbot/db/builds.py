@@ -141,6 +141,9 @@ class BuildsConnectorComponent(base.DBConnectorComponent):
                     q = q.where(tbl.c.complete_at != NULL)
                 else:
                     q = q.where(tbl.c.complete_at == NULL)
+            if resultSpec is None or not resultSpec.order:
+                # without an explicit order, return the builds in creation order
+                q = q.order_by(tbl.c.id)
 
             if resultSpec is not None:
                 return resultSpec.thd_execute(conn, q, self._builddictFromRow)
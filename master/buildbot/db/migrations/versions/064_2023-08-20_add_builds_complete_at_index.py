@@ -0,0 +1,36 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+
+"""add builds_complete_at index
+
+Revision ID: 064
+Revises: 063
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '064'
+down_revision = '063'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('builds_complete_at', "builds", ["builderid", "complete_at"])
+
+
+def downgrade():
+    op.drop_index("builds_complete_at")
@@ -950,6 +950,8 @@ class Model(base.DBConnectorComponent):
              builds.c.workerid)
     sa.Index('builds_masterid',
              builds.c.masterid)
+    sa.Index('builds_complete_at',
+             builds.c.builderid, builds.c.complete_at)
     sa.Index('steps_number', steps.c.buildid, steps.c.number,
              unique=True)
     sa.Index('steps_name', steps.c.buildid, steps.c.name,
@@ -22,6 +22,16 @@ from buildbot.process import properties
 from buildbot.process.results import SKIPPED
 
 
+@defer.inlineCallbacks
+def _get_cached(master, fetch_cache, path):
+    # returns the data API result for path via Deferred, memoized in fetch_cache if it is given
+    if fetch_cache is None:
+        return (yield master.data.get(path))
+    if path not in fetch_cache:
+        fetch_cache[path] = yield master.data.get(path)
+    return fetch_cache[path]
+
+
 class BuildRequestCollapser:
     # brids is a list of the new added buildrequests id
     # This class is called before generated the 'new' event for the
@@ -54,40 +64,82 @@ class BuildRequestCollapser:
         unclaim_brs.sort(key=lambda brd: brd['submitted_at'])
         return unclaim_brs
 
+    @defer.inlineCallbacks
+    def _prefetchBuildsets(self, brs, all_unclaim_brs):
+        bsids = {br['buildsetid'] for br in brs}
+        for unclaim_brs in all_unclaim_brs:
+            bsids.update(unclaim_br['buildsetid'] for unclaim_br in unclaim_brs)
+        paths = [('buildsets', str(bsid)) for bsid in bsids]
+        buildsets = yield defer.gatherResults([self.master.data.get(path) for path in paths])
+        return dict(zip(paths, buildsets))
+
     @defer.inlineCallbacks
     def collapse(self):
+        # local import to avoid circular imports
+        from buildbot.process.builder import Builder
+
         brids_to_collapse = set()
 
-        for brid in self.brids:
-            # Get the BuildRequest object
-            br = yield self.master.data.get(('buildrequests', brid))
-            # Retrieve the buildername
+        # Get all the BuildRequest objects at once
+        brs = yield defer.gatherResults([self.master.data.get(('buildrequests', brid))
+                                         for brid in self.brids])
+
+        # Retrieve the builders and their unclaimed buildrequests, once per builder
+        builderids = list({br['builderid'] for br in brs})
+        bldrdicts, all_unclaim_brs = yield defer.gatherResults([
+            defer.gatherResults([self.master.data.get(('builders', builderid))
+                                 for builderid in builderids]),
+            defer.gatherResults([self._getUnclaimedBrs(builderid)
+                                 for builderid in builderids]),
+        ])
+        bldrdicts = dict(zip(builderids, bldrdicts))
+        unclaim_brs_by_builderid = dict(zip(builderids, all_unclaim_brs))
+
+        # the default collapse function needs the buildsets of every compared buildrequest, so
+        # they are fetched all at once instead of once per compared pair. Everything else it
+        # fetches is memoized for the duration of this collapse pass.
+        fetch_cache = None
+
+        for br in brs:
             builderid = br['builderid']
-            bldrdict = yield self.master.data.get(('builders', builderid))
             # Get the builder object
-            bldr = self.master.botmaster.builders.get(bldrdict['name'])
+            bldr = self.master.botmaster.builders.get(bldrdicts[builderid]['name'])
             # Get the Collapse BuildRequest function (from the configuration)
             collapseRequestsFn = bldr.getCollapseRequestsFn() if bldr else None
-            unclaim_brs = yield self._getUnclaimedBrs(builderid)
+            unclaim_brs = unclaim_brs_by_builderid[builderid]
 
             # short circuit if there is no merging to do
             if not collapseRequestsFn or not unclaim_brs:
                 continue
 
+            is_default_fn = collapseRequestsFn is Builder._defaultCollapseRequestFn
+            if is_default_fn and fetch_cache is None:
+                fetch_cache = yield self._prefetchBuildsets(brs, all_unclaim_brs)
+
             for unclaim_br in unclaim_brs:
                 if unclaim_br['buildrequestid'] == br['buildrequestid']:
                     continue
 
-                canCollapse = yield collapseRequestsFn(self.master, bldr, br, unclaim_br)
+                if is_default_fn:
+                    canCollapse = yield BuildRequest.canBeCollapsed(self.master, br, unclaim_br,
+                                                                    fetch_cache=fetch_cache)
+                else:
+                    canCollapse = yield collapseRequestsFn(self.master, bldr, br, unclaim_br)
                 if canCollapse is True:
                     brids_to_collapse.add(unclaim_br['buildrequestid'])
 
-        collapsed_brids = []
-        for brid in brids_to_collapse:
-            claimed = yield self.master.data.updates.claimBuildRequests([brid])
-            if claimed:
-                yield self.master.data.updates.completeBuildRequests([brid], SKIPPED)
-                collapsed_brids.append(brid)
+        # claim all the buildrequests at once. This fails if any of them has been claimed in
+        # the meantime, in which case fall back to claiming them one by one
+        collapsed_brids = list(brids_to_collapse)
+        claimed = yield self.master.data.updates.claimBuildRequests(collapsed_brids)
+        if not claimed:
+            collapsed_brids = []
+            for brid in brids_to_collapse:
+                claimed = yield self.master.data.updates.claimBuildRequests([brid])
+                if claimed:
+                    collapsed_brids.append(brid)
+
+        yield self.master.data.updates.completeBuildRequests(collapsed_brids, SKIPPED)
 
         return collapsed_brids
 
@@ -105,22 +157,22 @@ class TempSourceStamp:
         ('patch_comment', 'comment')
     )
 
+    __slots__ = ATTRS + ('ssid', 'patch', 'patch_info', 'changes', '_ssdict', '_asdict')
+
     def __init__(self, ssdict):
         self._ssdict = ssdict
+        self._asdict = None
+        for attr in self.ATTRS:
+            setattr(self, attr, ssdict.get(attr))
+        self.ssid = ssdict.get('ssid')
 
-    def __getattr__(self, attr):
-        patch = self._ssdict.get('patch')
-        if attr == 'patch':
-            if patch:
-                return (patch['level'], patch['body'], patch['subdir'])
-            return None
-        elif attr == 'patch_info':
-            if patch:
-                return (patch['author'], patch['comment'])
-            return (None, None)
-        elif attr in self.ATTRS or attr == 'ssid':
-            return self._ssdict[attr]
-        raise AttributeError(attr)
+        patch = ssdict.get('patch')
+        if patch:
+            self.patch = (patch['level'], patch['body'], patch['subdir'])
+            self.patch_info = (patch['author'], patch['comment'])
+        else:
+            self.patch = None
+            self.patch_info = (None, None)
 
     def asSSDict(self):
         return self._ssdict
@@ -128,33 +180,48 @@ class TempSourceStamp:
     def asDict(self):
         # This return value should match the kwargs to
         # SourceStampsConnectorComponent.findSourceStampId
-        result = {}
-        for attr in self.ATTRS:
-            result[attr] = self._ssdict.get(attr)
+        if self._asdict is None:
+            result = {}
+            for attr in self.ATTRS:
+                result[attr] = self._ssdict.get(attr)
 
-        patch = self._ssdict.get('patch') or {}
-        for patch_attr, attr in self.PATCH_ATTRS:
-            result[patch_attr] = patch.get(attr)
+            patch = self._ssdict.get('patch') or {}
+            for patch_attr, attr in self.PATCH_ATTRS:
+                result[patch_attr] = patch.get(attr)
 
-        assert all(
-            isinstance(val, (str, int, bytes, type(None)))
-            for attr, val in result.items()
-        ), result
-        return result
+            assert all(
+                isinstance(val, (str, int, bytes, type(None)))
+                for attr, val in result.items()
+            ), result
+            self._asdict = result
+        # callers are free to modify the returned dictionary
+        return self._asdict.copy()
 
 
 class TempChange:
     # temporary fake change
 
+    ATTRS = ('changeid', 'parent_changeids', 'author', 'committer', 'files', 'comments',
+             'revision', 'when_timestamp', 'branch', 'category', 'revlink', 'repository',
+             'project', 'codebase', 'sourcestamp')
+
+    __slots__ = ATTRS + ('_chdict', '_properties')
+
     def __init__(self, d):
         self._chdict = d
+        self._properties = None
+        for attr in self.ATTRS:
+            setattr(self, attr, d.get(attr))
+
+    @property
+    def who(self):
+        return self.author
 
-    def __getattr__(self, attr):
-        if attr == 'who':
-            return self._chdict['author']
-        elif attr == 'properties':
-            return properties.Properties.fromDict(self._chdict['properties'])
-        return self._chdict[attr]
+    @property
+    def properties(self):
+        if self._properties is None:
+            self._properties = properties.Properties.fromDict(self._chdict['properties'])
+        return self._properties
 
     def asChDict(self):
         return self._chdict
@@ -221,34 +288,46 @@ class BuildRequest:
         buildrequest = cls()
         buildrequest.id = brid
         buildrequest.bsid = brdict['buildsetid']
-        builder = yield master.db.builders.getBuilder(brdict['builderid'])
-        buildrequest.buildername = builder['name']
         buildrequest.builderid = brdict['builderid']
         buildrequest.priority = brdict['priority']
         dt = brdict['submitted_at']
-        buildrequest.submittedAt = dt and calendar.timegm(dt.utctimetuple())
+        if dt is None:
+            buildrequest.submittedAt = None
+        elif dt.tzinfo is None:
+            # naive datetimes are in UTC
+            buildrequest.submittedAt = calendar.timegm(dt.utctimetuple())
+        else:
+            buildrequest.submittedAt = int(dt.timestamp())
         buildrequest.master = master
         buildrequest.waitedFor = brdict['waited_for']
 
-        # fetch the buildset to get the reason
-        buildset = yield master.db.buildsets.getBuildset(brdict['buildsetid'])
+        # fetch the builder name, the buildset to get the reason, the buildset properties and
+        # the buildset sourcestamps all at once
+        builder, buildset, buildset_properties, bsdata = yield defer.gatherResults([
+            master.db.builders.getBuilder(brdict['builderid']),
+            master.db.buildsets.getBuildset(brdict['buildsetid']),
+            master.db.buildsets.getBuildsetProperties(brdict['buildsetid']),
+            master.data.get(('buildsets', str(buildrequest.bsid))),
+        ])
+        buildrequest.buildername = builder['name']
+
         assert buildset  # schema should guarantee this
         buildrequest.reason = buildset['reason']
 
-        # fetch the buildset properties, and convert to Properties
-        buildset_properties = yield master.db.buildsets.getBuildsetProperties(brdict['buildsetid'])
-
+        # convert the buildset properties to Properties
         buildrequest.properties = properties.Properties.fromDict(
             buildset_properties)
 
         # make a fake sources dict (temporary)
-        bsdata = yield master.data.get(('buildsets', str(buildrequest.bsid)))
         assert bsdata[
             'sourcestamps'], "buildset must have at least one sourcestamp"
+        all_changes = yield defer.gatherResults([
+            master.data.get(("sourcestamps", ssdata['ssid'], "changes"))
+            for ssdata in bsdata['sourcestamps']
+        ])
         buildrequest.sources = {}
-        for ssdata in bsdata['sourcestamps']:
+        for ssdata, changes in zip(bsdata['sourcestamps'], all_changes):
             ss = buildrequest.sources[ssdata['codebase']] = TempSourceStamp(ssdata)
-            changes = yield master.data.get(("sourcestamps", ss.ssid, "changes"))
             ss.changes = [TempChange(change) for change in changes]
 
         return buildrequest
@@ -260,11 +339,28 @@ class BuildRequest:
 
     @staticmethod
     @defer.inlineCallbacks
-    def canBeCollapsed(master, new_br, old_br):
+    def _getBuildsetPropsForCollapsing(master, bsid, fetch_cache):
+        # the filtered properties are memoized too, so that they are computed only once per
+        # buildset during a collapse pass
+        key = ('buildsets', str(bsid), 'properties', 'for_collapsing')
+        if fetch_cache is not None and key in fetch_cache:
+            return fetch_cache[key]
+        bs_props = yield _get_cached(master, fetch_cache, ('buildsets', str(bsid), 'properties'))
+        bs_props = BuildRequest.filter_buildset_props_for_collapsing(bs_props)
+        if fetch_cache is not None:
+            fetch_cache[key] = bs_props
+        return bs_props
+
+    @staticmethod
+    @defer.inlineCallbacks
+    def canBeCollapsed(master, new_br, old_br, fetch_cache=None):
         """
         Returns true if both buildrequest can be merged, via Deferred.
 
         This implements Buildbot's default collapse strategy.
+
+        @param fetch_cache: optional dictionary of data API results, keyed by path. It is
+        filled with the results fetched by this method so that it can be shared between calls.
         """
         # short-circuit: if these are for the same buildset, collapse away
         if new_br['buildsetid'] == old_br['buildsetid']:
@@ -277,8 +373,10 @@ class BuildRequest:
             return False
 
         # get the buildsets for each buildrequest
-        selfBuildsets = yield master.data.get(('buildsets', str(new_br['buildsetid'])))
-        otherBuildsets = yield master.data.get(('buildsets', str(old_br['buildsetid'])))
+        selfBuildsets, otherBuildsets = yield defer.gatherResults([
+            _get_cached(master, fetch_cache, ('buildsets', str(new_br['buildsetid']))),
+            _get_cached(master, fetch_cache, ('buildsets', str(old_br['buildsetid']))),
+        ])
 
         # extract sourcestamps, as dictionaries by codebase
         selfSources = dict((ss['codebase'], ss)
@@ -290,6 +388,8 @@ class BuildRequest:
         if set(selfSources) != set(otherSources):
             return False
 
+        # compare what is already known first, so that incompatible buildrequests are rejected
+        # without fetching anything else
         for c, selfSS in selfSources.items():
             otherSS = otherSources[c]
             if selfSS['repository'] != otherSS['repository']:
@@ -304,9 +404,20 @@ class BuildRequest:
             # anything with a patch won't be collapsed
             if selfSS['patch'] or otherSS['patch']:
                 return False
-            # get changes & compare
-            selfChanges = yield master.data.get(('sourcestamps', selfSS['ssid'], 'changes'))
-            otherChanges = yield master.data.get(('sourcestamps', otherSS['ssid'], 'changes'))
+
+        # get changes of both sides all at once
+        codebases = list(selfSources)
+        dl = []
+        for c in codebases:
+            dl.append(_get_cached(master, fetch_cache,
+                                  ('sourcestamps', selfSources[c]['ssid'], 'changes')))
+            dl.append(_get_cached(master, fetch_cache,
+                                  ('sourcestamps', otherSources[c]['ssid'], 'changes')))
+        all_changes = yield defer.gatherResults(dl)
+
+        for i, c in enumerate(codebases):
+            # compare changes
+            selfChanges, otherChanges = all_changes[2 * i:2 * i + 2]
             # if both have changes, proceed, else fail - if no changes check revision instead
             if selfChanges and otherChanges:
                 continue
@@ -318,15 +429,16 @@ class BuildRequest:
                 return False
 
             # else check revisions
-            if selfSS['revision'] != otherSS['revision']:
+            if selfSources[c]['revision'] != otherSources[c]['revision']:
                 return False
 
         # don't collapse build requests if the properties injected by the scheduler differ
-        new_bs_props = yield master.data.get(('buildsets', str(new_br['buildsetid']), 'properties'))
-        old_bs_props = yield master.data.get(('buildsets', str(old_br['buildsetid']), 'properties'))
-
-        new_bs_props = BuildRequest.filter_buildset_props_for_collapsing(new_bs_props)
-        old_bs_props = BuildRequest.filter_buildset_props_for_collapsing(old_bs_props)
+        new_bs_props, old_bs_props = yield defer.gatherResults([
+            BuildRequest._getBuildsetPropsForCollapsing(master, new_br['buildsetid'],
+                                                        fetch_cache),
+            BuildRequest._getBuildsetPropsForCollapsing(master, old_br['buildsetid'],
+                                                        fetch_cache),
+        ])
         if new_bs_props != old_bs_props:
             return False
 
@@ -334,26 +446,13 @@ class BuildRequest:
 
     def mergeSourceStampsWith(self, others):
         """ Returns one merged sourcestamp for every codebase """
-        # get all codebases from all requests
-        all_codebases = set(self.sources)
+        # walk along the requests, the sourcestamp of the last request having a codebase wins
+        # TODO: select the sourcestamp that best represents the merge,
+        # preferably the latest one.  This used to be accomplished by
+        # looking at changeids and picking the highest-numbered.
+        all_merged_sources = dict(self.sources)
         for other in others:
-            all_codebases |= set(other.sources)
-
-        all_merged_sources = {}
-        # walk along the codebases
-        for codebase in all_codebases:
-            all_sources = []
-            if codebase in self.sources:
-                all_sources.append(self.sources[codebase])
-            for other in others:
-                if codebase in other.sources:
-                    all_sources.append(other.sources[codebase])
-            assert all_sources, "each codebase should have at least one sourcestamp"
-
-            # TODO: select the sourcestamp that best represents the merge,
-            # preferably the latest one.  This used to be accomplished by
-            # looking at changeids and picking the highest-numbered.
-            all_merged_sources[codebase] = all_sources[-1]
+            all_merged_sources.update(other.sources)
 
         return list(all_merged_sources.values())
 
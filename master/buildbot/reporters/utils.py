@@ -13,7 +13,7 @@
 #
 # Copyright Buildbot Team Members
 
-from collections import UserList
+import itertools
 
 from twisted.internet import defer
 from twisted.python import log
@@ -21,7 +21,10 @@ from twisted.python import log
 from buildbot.data import resultspec
 from buildbot.process.properties import renderer
 from buildbot.process.results import RETRY
-from buildbot.util import flatten
+
+
+# maximum number of builds fetched at once when looking for the previous build
+_PREVIOUS_BUILD_MAX_BATCH_SIZE = 16
 
 
 @defer.inlineCallbacks
@@ -29,13 +32,23 @@ def getPreviousBuild(master, build):
     # naive n-1 algorithm. Still need to define what we should skip
     # SKIP builds? forced builds? rebuilds?
     # don't hesitate to contribute improvements to that algorithm
+
+    # Usually the build just before is the previous one, so start by fetching it alone. If it
+    # needs to be skipped, fetch increasingly bigger batches of builds in parallel.
     n = build['number'] - 1
+    batch_size = 1
     while n >= 0:
-        prev = yield master.data.get(("builders", build['builderid'], "builds", n))
-
-        if prev and prev['results'] != RETRY:
-            return prev
-        n -= 1
+        numbers = range(n, max(n - batch_size, -1), -1)
+        prevs = yield defer.gatherResults([
+            master.data.get(("builders", build['builderid'], "builds", number))
+            for number in numbers
+        ])
+
+        for prev in prevs:
+            if prev and prev['results'] != RETRY:
+                return prev
+        n -= batch_size
+        batch_size = min(batch_size * 2, _PREVIOUS_BUILD_MAX_BATCH_SIZE)
     return None
 
 
@@ -57,7 +70,7 @@ def getDetailsForBuildset(master, bsid, want_properties=False, want_steps=False,
           for breq in breqs]
 
     builds = yield defer.gatherResults(dl)
-    builds = flatten(builds, types=(list, UserList))
+    builds = list(itertools.chain.from_iterable(builds))
     if builds:
         yield getDetailsForBuilds(master, buildset, builds, want_properties=want_properties,
                                   want_steps=want_steps, want_previous_build=want_previous_build,
@@ -67,6 +80,15 @@ def getDetailsForBuildset(master, bsid, want_properties=False, want_steps=False,
     return {"buildset": buildset, "builds": builds}
 
 
+@defer.inlineCallbacks
+def _getParentBuildAndBuilder(master, buildset):
+    if not buildset['parent_buildid']:
+        return None, None
+    parentbuild = yield master.data.get(("builds", buildset['parent_buildid']))
+    parentbuilder = yield master.data.get(("builders", parentbuild['builderid']))
+    return parentbuild, parentbuilder
+
+
 @defer.inlineCallbacks
 def getDetailsForBuild(master, build, want_properties=False, want_steps=False,
                        want_previous_build=False, want_logs=False, want_logs_content=False):
@@ -74,26 +96,26 @@ def getDetailsForBuild(master, build, want_properties=False, want_steps=False,
     buildset = yield master.data.get(("buildsets", buildrequest['buildsetid']))
     build['buildrequest'], build['buildset'] = buildrequest, buildset
 
-    parentbuild = None
-    parentbuilder = None
-    if buildset['parent_buildid']:
-        parentbuild = yield master.data.get(("builds", buildset['parent_buildid']))
-        parentbuilder = yield master.data.get(("builders", parentbuild['builderid']))
+    # the parent build does not depend on the details of this build, so fetch both at once
+    (parentbuild, parentbuilder), ret = yield defer.gatherResults([
+        _getParentBuildAndBuilder(master, buildset),
+        getDetailsForBuilds(master, buildset, [build],
+                            want_properties=want_properties, want_steps=want_steps,
+                            want_previous_build=want_previous_build,
+                            want_logs=want_logs,
+                            want_logs_content=want_logs_content)
+    ])
     build['parentbuild'] = parentbuild
     build['parentbuilder'] = parentbuilder
-
-    ret = yield getDetailsForBuilds(master, buildset, [build],
-                                    want_properties=want_properties, want_steps=want_steps,
-                                    want_previous_build=want_previous_build,
-                                    want_logs=want_logs,
-                                    want_logs_content=want_logs_content)
     return ret
 
 
 @defer.inlineCallbacks
 def get_details_for_buildrequest(master, buildrequest, build):
-    buildset = yield master.data.get(("buildsets", buildrequest['buildsetid']))
-    builder = yield master.data.get(("builders", buildrequest['builderid']))
+    buildset, builder = yield defer.gatherResults([
+        master.data.get(("buildsets", buildrequest['buildsetid'])),
+        master.data.get(("builders", buildrequest['builderid'])),
+    ])
 
     build['buildrequest'] = buildrequest
     build['buildset'] = buildset
@@ -108,49 +130,57 @@ def get_details_for_buildrequest(master, buildrequest, build):
 def getDetailsForBuilds(master, buildset, builds, want_properties=False, want_steps=False,
                         want_previous_build=False, want_logs=False, want_logs_content=False):
 
+    if want_logs_content:
+        want_logs = True
+    if want_logs:
+        want_steps = True
+
     builderids = {build['builderid'] for build in builds}
 
-    builders = yield defer.gatherResults([master.data.get(("builders", _id))
-                                          for _id in builderids])
+    def fetch_for_builds(wanted, fetch):
+        if not wanted:
+            # we still need a list for the big zip
+            return defer.succeed(list(range(len(builds))))
+        return defer.gatherResults([fetch(build) for build in builds])
+
+    # all of these are independent, so fetch them all at once
+    builders, buildproperties, prev_builds, buildsteps = yield defer.gatherResults([
+        defer.gatherResults([master.data.get(("builders", _id))
+                             for _id in builderids]),
+        fetch_for_builds(want_properties,
+                         lambda build: master.data.get(("builds", build['buildid'], 'properties'))),
+        fetch_for_builds(want_previous_build,
+                         lambda build: getPreviousBuild(master, build)),
+        fetch_for_builds(want_steps,
+                         lambda build: master.data.get(("builds", build['buildid'], 'steps'))),
+    ])
 
     buildersbyid = {builder['builderid']: builder
                     for builder in builders}
 
-    if want_properties:
-        buildproperties = yield defer.gatherResults(
-            [master.data.get(("builds", build['buildid'], 'properties'))
-             for build in builds])
-    else:  # we still need a list for the big zip
-        buildproperties = list(range(len(builds)))
-
-    if want_previous_build:
-        prev_builds = yield defer.gatherResults(
-            [getPreviousBuild(master, build) for build in builds])
-    else:  # we still need a list for the big zip
-        prev_builds = list(range(len(builds)))
-
-    if want_logs_content:
-        want_logs = True
     if want_logs:
-        want_steps = True
-
-    if want_steps:  # pylint: disable=too-many-nested-blocks
-        buildsteps = yield defer.gatherResults(
-            [master.data.get(("builds", build['buildid'], 'steps'))
-             for build in builds])
-        if want_logs:
-            for build, build_steps in zip(builds, buildsteps):
-                for s in build_steps:
-                    logs = yield master.data.get(("steps", s['stepid'], 'logs'))
-                    s['logs'] = list(logs)
-                    for l in s['logs']:
-                        l['url'] = get_url_for_log(master, build['builderid'], build['number'],
-                                                   s['number'], l['slug'])
-                        if want_logs_content:
-                            l['content'] = yield master.data.get(("logs", l['logid'], 'contents'))
-
-    else:  # we still need a list for the big zip
-        buildsteps = list(range(len(builds)))
+        all_steps = [(build, s)
+                     for build, build_steps in zip(builds, buildsteps)
+                     for s in build_steps]
+        all_logs = yield defer.gatherResults(
+            [master.data.get(("steps", s['stepid'], 'logs'))
+             for _, s in all_steps])
+
+        step_logs = []
+        for (build, s), logs in zip(all_steps, all_logs):
+            s['logs'] = list(logs)
+            logs_url = _get_url_prefix_for_logs(master, build['builderid'], build['number'],
+                                                s['number'])
+            for l in s['logs']:
+                l['url'] = f"{logs_url}{l['slug']}"
+                step_logs.append(l)
+
+        if want_logs_content:
+            contents = yield defer.gatherResults(
+                [master.data.get(("logs", l['logid'], 'contents'))
+                 for l in step_logs])
+            for l, content in zip(step_logs, contents):
+                l['content'] = content
 
     # a big zip to connect everything together
     for build, properties, steps, prev in zip(builds, buildproperties, buildsteps, prev_builds):
@@ -172,19 +202,33 @@ def getDetailsForBuilds(master, buildset, builds, want_properties=False, want_st
 # perhaps we need data api for users with sourcestamps/:id/users
 @defer.inlineCallbacks
 def getResponsibleUsersForSourceStamp(master, sourcestampid):
-    changesd = master.data.get(("sourcestamps", sourcestampid, "changes"))
-    sourcestampd = master.data.get(("sourcestamps", sourcestampid))
-    changes, sourcestamp = yield defer.gatherResults([changesd, sourcestampd])
-    blamelist = set()
-    # normally, we get only one, but just assume there might be several
-    for c in changes:
-        blamelist.add(c['author'])
-    # Add patch author to blamelist
-    if 'patch' in sourcestamp and sourcestamp['patch'] is not None:
-        blamelist.add(sourcestamp['patch']['author'])
-    blamelist = list(blamelist)
-    blamelist.sort()
-    return blamelist
+    blamelists = yield getResponsibleUsersForSourceStamps(master, [sourcestampid])
+    return blamelists[sourcestampid]
+
+
+@defer.inlineCallbacks
+def getResponsibleUsersForSourceStamps(master, sourcestampids):
+    # returns a dictionary of blamelists keyed by sourcestamp id
+    dl = []
+    for sourcestampid in sourcestampids:
+        dl.append(master.data.get(("sourcestamps", sourcestampid, "changes")))
+        dl.append(master.data.get(("sourcestamps", sourcestampid)))
+    results = yield defer.gatherResults(dl)
+
+    blamelists = {}
+    for i, sourcestampid in enumerate(sourcestampids):
+        changes, sourcestamp = results[2 * i:2 * i + 2]
+        blamelist = set()
+        # normally, we get only one, but just assume there might be several
+        for c in changes:
+            blamelist.add(c['author'])
+        # Add patch author to blamelist
+        if 'patch' in sourcestamp and sourcestamp['patch'] is not None:
+            blamelist.add(sourcestamp['patch']['author'])
+        blamelist = list(blamelist)
+        blamelist.sort()
+        blamelists[sourcestampid] = blamelist
+    return blamelists
 
 
 # perhaps we need data api for users with builds/:id/users
@@ -231,10 +275,14 @@ def getURLForBuildrequest(master, buildrequestid):
     return f"{prefix}#/buildrequests/{buildrequestid}"
 
 
-def get_url_for_log(master, builderid, build_number, step_number, log_slug):
+def _get_url_prefix_for_logs(master, builderid, build_number, step_number):
     prefix = master.config.buildbotURL
-    return f"{prefix}#/builders/{builderid}/builds/{build_number}/" + \
-        f"steps/{step_number}/logs/{log_slug}"
+    return f"{prefix}#/builders/{builderid}/builds/{build_number}/steps/{step_number}/logs/"
+
+
+def get_url_for_log(master, builderid, build_number, step_number, log_slug):
+    logs_url = _get_url_prefix_for_logs(master, builderid, build_number, step_number)
+    return f"{logs_url}{log_slug}"
 
 
 @renderer
@@ -127,8 +127,7 @@ class TestReactor(NonReactor, CoreReactor, Clock):
 
     def _executeCurrentDelayedCalls(self):
         while self.getDelayedCalls():
-            first = sorted(self.getDelayedCalls(),
-                           key=lambda a: a.getTime())[0]
+            first = min(self.getDelayedCalls(), key=lambda a: a.getTime())
             if first.getTime() > self.seconds():
                 break
             self.advance(0)
@@ -102,7 +102,7 @@ class FakeBuildsComponent(FakeDBComponent):
     def getBuilds(self, builderid=None, buildrequestid=None, workerid=None, complete=None,
                   resultSpec=None):
         ret = []
-        for row in self.builds.values():
+        for _, row in sorted(self.builds.items()):
             if builderid is not None and row['builderid'] != builderid:
                 continue
             if buildrequestid is not None and row['buildrequestid'] != buildrequestid:
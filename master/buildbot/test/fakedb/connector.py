@@ -102,9 +102,17 @@ class FakeDBConnector(service.AsyncMultiService):
     def insert_test_data(self, rows):
         """Insert a list of Row instances into the database; this method can be
         called synchronously or asynchronously (it completes immediately) """
-        for row in rows:
-            if self.checkForeignKeys:
+        if self.checkForeignKeys:
+            # foreign keys are checked against the rows inserted so far, so
+            # the rows need to be inserted one at a time
+            for row in rows:
                 row.checkForeignKeys(self, self.t)
+                for comp in self._components:
+                    comp.insert_test_data([row])
+        else:
+            # each component only picks the rows of its own tables, so hand
+            # it the whole batch at once
+            rows = list(rows)
             for comp in self._components:
-                comp.insert_test_data([row])
+                comp.insert_test_data(rows)
         return defer.succeed(None)
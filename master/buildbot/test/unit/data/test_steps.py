@@ -30,6 +30,84 @@ TIME2 = 2002222
 TIME3 = 2003333
 TIME4 = 2004444
 
+DT1 = epoch2datetime(TIME1)
+DT2 = epoch2datetime(TIME2)
+DT3 = epoch2datetime(TIME3)
+DT4 = epoch2datetime(TIME4)
+
+# the message and db dict of the step seeded by the Step tests, before any update
+_STEP_MSG_BASE = {
+    'buildid': 10,
+    'complete': False,
+    'complete_at': None,
+    'name': 'ten',
+    'number': 0,
+    'results': None,
+    'started_at': None,
+    "locks_acquired_at": None,
+    'state_string': 'pending',
+    'stepid': 100,
+    'urls': [],
+    'hidden': False,
+}
+
+_STEP_MODEL_BASE = {
+    'buildid': 10,
+    'complete_at': None,
+    'id': 100,
+    'name': 'ten',
+    'number': 0,
+    'results': None,
+    'started_at': None,
+    "locks_acquired_at": None,
+    'state_string': 'pending',
+    'urls': [],
+    'hidden': False,
+}
+
+
+def _step_model(**kwargs):
+    return {**_STEP_MODEL_BASE, **kwargs}
+
+
+stepTestData = [
+    fakedb.Worker(id=47, name='linux'),
+    fakedb.Builder(id=77, name='builder77'),
+    fakedb.Master(id=88),
+    fakedb.Buildset(id=8822),
+    fakedb.BuildRequest(id=82, buildsetid=8822),
+    fakedb.Build(id=30, builderid=77, number=7, masterid=88,
+                 buildrequestid=82, workerid=47),
+    fakedb.Step(id=70, number=0, name='one', buildid=30,
+                started_at=TIME1, locks_acquired_at=TIME2, complete_at=TIME3, results=0),
+    fakedb.Step(id=71, number=1, name='two', buildid=30,
+                started_at=TIME2, locks_acquired_at=TIME3, complete_at=TIME4, results=2,
+                urls_json='[{"name":"url","url":"http://url"}]'),
+    fakedb.Step(id=72, number=2, name='three', buildid=30,
+                started_at=TIME4, hidden=True),
+]
+
+stepsTestData = [
+    fakedb.Worker(id=47, name='linux'),
+    fakedb.Builder(id=77, name='builder77'),
+    fakedb.Master(id=88),
+    fakedb.Buildset(id=8822),
+    fakedb.BuildRequest(id=82, buildsetid=8822),
+    fakedb.Build(id=30, builderid=77, number=7, masterid=88,
+                 buildrequestid=82, workerid=47),
+    fakedb.Build(id=31, builderid=77, number=8, masterid=88,
+                 buildrequestid=82, workerid=47),
+    fakedb.Step(id=70, number=0, name='one', buildid=30,
+                started_at=TIME1, locks_acquired_at=TIME2, complete_at=TIME3, results=0),
+    fakedb.Step(id=71, number=1, name='two', buildid=30,
+                started_at=TIME2, locks_acquired_at=TIME3, complete_at=TIME4, results=2,
+                urls_json='[{"name":"url","url":"http://url"}]'),
+    fakedb.Step(id=72, number=2, name='three', buildid=30,
+                started_at=TIME4),
+    fakedb.Step(id=73, number=0, name='otherbuild', buildid=31,
+                started_at=TIME3),
+]
+
 
 class StepEndpoint(endpoint.EndpointMixin, unittest.TestCase):
 
@@ -38,22 +116,7 @@ class StepEndpoint(endpoint.EndpointMixin, unittest.TestCase):
 
     def setUp(self):
         self.setUpEndpoint()
-        self.db.insert_test_data([
-            fakedb.Worker(id=47, name='linux'),
-            fakedb.Builder(id=77, name='builder77'),
-            fakedb.Master(id=88),
-            fakedb.Buildset(id=8822),
-            fakedb.BuildRequest(id=82, buildsetid=8822),
-            fakedb.Build(id=30, builderid=77, number=7, masterid=88,
-                         buildrequestid=82, workerid=47),
-            fakedb.Step(id=70, number=0, name='one', buildid=30,
-                        started_at=TIME1, locks_acquired_at=TIME2, complete_at=TIME3, results=0),
-            fakedb.Step(id=71, number=1, name='two', buildid=30,
-                        started_at=TIME2, locks_acquired_at=TIME3, complete_at=TIME4, results=2,
-                        urls_json='[{"name":"url","url":"http://url"}]'),
-            fakedb.Step(id=72, number=2, name='three', buildid=30,
-                        started_at=TIME4, hidden=True),
-        ])
+        return self.db.insert_test_data(stepTestData)
 
     def tearDown(self):
         self.tearDownEndpoint()
@@ -69,7 +132,7 @@ class StepEndpoint(endpoint.EndpointMixin, unittest.TestCase):
             'name': 'three',
             'number': 2,
             'results': None,
-            'started_at': epoch2datetime(TIME4),
+            'started_at': DT4,
             "locks_acquired_at": None,
             'state_string': '',
             'stepid': 72,
@@ -124,26 +187,7 @@ class StepsEndpoint(endpoint.EndpointMixin, unittest.TestCase):
 
     def setUp(self):
         self.setUpEndpoint()
-        self.db.insert_test_data([
-            fakedb.Worker(id=47, name='linux'),
-            fakedb.Builder(id=77, name='builder77'),
-            fakedb.Master(id=88),
-            fakedb.Buildset(id=8822),
-            fakedb.BuildRequest(id=82, buildsetid=8822),
-            fakedb.Build(id=30, builderid=77, number=7, masterid=88,
-                         buildrequestid=82, workerid=47),
-            fakedb.Build(id=31, builderid=77, number=8, masterid=88,
-                         buildrequestid=82, workerid=47),
-            fakedb.Step(id=70, number=0, name='one', buildid=30,
-                        started_at=TIME1, locks_acquired_at=TIME2, complete_at=TIME3, results=0),
-            fakedb.Step(id=71, number=1, name='two', buildid=30,
-                        started_at=TIME2, locks_acquired_at=TIME3, complete_at=TIME4, results=2,
-                        urls_json='[{"name":"url","url":"http://url"}]'),
-            fakedb.Step(id=72, number=2, name='three', buildid=30,
-                        started_at=TIME4),
-            fakedb.Step(id=73, number=0, name='otherbuild', buildid=31,
-                        started_at=TIME3),
-        ])
+        return self.db.insert_test_data(stepsTestData)
 
     def tearDown(self):
         self.tearDownEndpoint()
@@ -180,9 +224,13 @@ class Step(TestReactorMixin, interfaces.InterfaceTests, unittest.TestCase):
 
     def setUp(self):
         self.setup_test_reactor()
-        self.master = fakemaster.make_master(self, wantMq=True, wantDb=True,
-                                             wantData=True)
+        # wantData implies a fake mq and db
+        self.master = fakemaster.make_master(self, wantData=True)
         self.rtype = steps.Step(self.master)
+        return self.master.db.insert_test_data([
+            fakedb.Step(id=100, buildid=10, number=0, name='ten', started_at=None,
+                        state_string='pending'),
+        ])
 
     def test_signature_addStep(self):
         @self.assertArgSpecMatches(
@@ -195,38 +243,13 @@ class Step(TestReactorMixin, interfaces.InterfaceTests, unittest.TestCase):
     def test_addStep(self):
         stepid, number, name = yield self.rtype.addStep(buildid=10,
                                                         name='name')
-        msgBody = {
-            'buildid': 10,
-            'complete': False,
-            'complete_at': None,
-            'name': name,
-            'number': number,
-            'results': None,
-            'started_at': None,
-            "locks_acquired_at": None,
-            'state_string': 'pending',
-            'stepid': stepid,
-            'urls': [],
-            'hidden': False,
-        }
+        msgBody = {**_STEP_MSG_BASE, 'name': name, 'number': number, 'stepid': stepid}
         self.master.mq.assertProductions([
             (('builds', '10', 'steps', str(stepid), 'new'), msgBody),
             (('steps', str(stepid), 'new'), msgBody),
         ])
         step = yield self.master.db.steps.getStep(stepid)
-        self.assertEqual(step, {
-            'buildid': 10,
-            'complete_at': None,
-            'id': stepid,
-            'name': name,
-            'number': number,
-            'results': None,
-            'started_at': None,
-            "locks_acquired_at": None,
-            'state_string': 'pending',
-            'urls': [],
-            'hidden': False,
-        })
+        self.assertEqual(step, _step_model(id=stepid, name=name, number=number))
 
     @defer.inlineCallbacks
     def test_fake_addStep(self):
@@ -243,87 +266,36 @@ class Step(TestReactorMixin, interfaces.InterfaceTests, unittest.TestCase):
             pass
 
     @defer.inlineCallbacks
-    def test_startStep(self):
+    def _start_step(self):
         self.reactor.advance(TIME1)
-        yield self.master.db.steps.addStep(buildid=10, name='ten',
-                                           state_string='pending')
         yield self.rtype.startStep(stepid=100)
 
-        msgBody = {
-            'buildid': 10,
-            'complete': False,
-            'complete_at': None,
-            'name': 'ten',
-            'number': 0,
-            'results': None,
-            'started_at': epoch2datetime(TIME1),
-            "locks_acquired_at": None,
-            'state_string': 'pending',
-            'stepid': 100,
-            'urls': [],
-            'hidden': False,
-        }
+    @defer.inlineCallbacks
+    def test_startStep(self):
+        yield self._start_step()
+
+        msgBody = {**_STEP_MSG_BASE, 'started_at': DT1}
         self.master.mq.assertProductions([
             (('builds', '10', 'steps', str(100), 'started'), msgBody),
             (('steps', str(100), 'started'), msgBody),
         ])
         step = yield self.master.db.steps.getStep(100)
-        self.assertEqual(step, {
-            'buildid': 10,
-            'complete_at': None,
-            'id': 100,
-            'name': 'ten',
-            'number': 0,
-            'results': None,
-            'started_at': epoch2datetime(TIME1),
-            "locks_acquired_at": None,
-            'state_string': 'pending',
-            'urls': [],
-            'hidden': False,
-        })
+        self.assertEqual(step, _step_model(started_at=DT1))
 
     @defer.inlineCallbacks
     def test_startStep_acquire_locks(self):
-        self.reactor.advance(TIME1)
-        yield self.master.db.steps.addStep(buildid=10, name='ten',
-                                           state_string='pending')
-        yield self.rtype.startStep(stepid=100)
+        yield self._start_step()
         self.reactor.advance(TIME2 - TIME1)
         self.master.mq.clearProductions()
         yield self.rtype.set_step_locks_acquired_at(stepid=100)
 
-        msgBody = {
-            'buildid': 10,
-            'complete': False,
-            'complete_at': None,
-            'name': 'ten',
-            'number': 0,
-            'results': None,
-            'started_at': epoch2datetime(TIME1),
-            "locks_acquired_at": epoch2datetime(TIME2),
-            'state_string': 'pending',
-            'stepid': 100,
-            'urls': [],
-            'hidden': False,
-        }
+        msgBody = {**_STEP_MSG_BASE, 'started_at': DT1, "locks_acquired_at": DT2}
         self.master.mq.assertProductions([
             (('builds', '10', 'steps', str(100), 'updated'), msgBody),
             (('steps', str(100), 'updated'), msgBody),
         ])
         step = yield self.master.db.steps.getStep(100)
-        self.assertEqual(step, {
-            'buildid': 10,
-            'complete_at': None,
-            'id': 100,
-            'name': 'ten',
-            'number': 0,
-            'results': None,
-            'started_at': epoch2datetime(TIME1),
-            "locks_acquired_at": epoch2datetime(TIME2),
-            'state_string': 'pending',
-            'urls': [],
-            'hidden': False,
-        })
+        self.assertEqual(step, _step_model(started_at=DT1, locks_acquired_at=DT2))
 
     def test_signature_setStepStateString(self):
         @self.assertArgSpecMatches(
@@ -334,42 +306,15 @@ class Step(TestReactorMixin, interfaces.InterfaceTests, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_setStepStateString(self):
-        yield self.master.db.steps.addStep(buildid=10, name='ten',
-                                           state_string='pending')
         yield self.rtype.setStepStateString(stepid=100, state_string='hi')
 
-        msgBody = {
-            'buildid': 10,
-            'complete': False,
-            'complete_at': None,
-            'name': 'ten',
-            'number': 0,
-            'results': None,
-            'started_at': None,
-            "locks_acquired_at": None,
-            'state_string': 'hi',
-            'stepid': 100,
-            'urls': [],
-            'hidden': False,
-        }
+        msgBody = {**_STEP_MSG_BASE, 'state_string': 'hi'}
         self.master.mq.assertProductions([
             (('builds', '10', 'steps', str(100), 'updated'), msgBody),
             (('steps', str(100), 'updated'), msgBody),
         ])
         step = yield self.master.db.steps.getStep(100)
-        self.assertEqual(step, {
-            'buildid': 10,
-            'complete_at': None,
-            'id': 100,
-            'name': 'ten',
-            'number': 0,
-            'results': None,
-            'started_at': None,
-            "locks_acquired_at": None,
-            'state_string': 'hi',
-            'urls': [],
-            'hidden': False,
-        })
+        self.assertEqual(step, _step_model(state_string='hi'))
 
     def test_signature_finishStep(self):
         @self.assertArgSpecMatches(
@@ -380,47 +325,27 @@ class Step(TestReactorMixin, interfaces.InterfaceTests, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_finishStep(self):
-        yield self.master.db.steps.addStep(buildid=10, name='ten',
-                                           state_string='pending')
-        self.reactor.advance(TIME1)
-        yield self.rtype.startStep(stepid=100)
+        yield self._start_step()
         yield self.rtype.set_step_locks_acquired_at(stepid=100)
         self.reactor.advance(TIME2 - TIME1)
         self.master.mq.clearProductions()
         yield self.rtype.finishStep(stepid=100, results=9, hidden=False)
 
         msgBody = {
-            'buildid': 10,
+            **_STEP_MSG_BASE,
             'complete': True,
-            'complete_at': epoch2datetime(TIME2),
-            'name': 'ten',
-            'number': 0,
+            'complete_at': DT2,
             'results': 9,
-            'started_at': epoch2datetime(TIME1),
-            "locks_acquired_at": epoch2datetime(TIME1),
-            'state_string': 'pending',
-            'stepid': 100,
-            'urls': [],
-            'hidden': False,
+            'started_at': DT1,
+            "locks_acquired_at": DT1,
         }
         self.master.mq.assertProductions([
             (('builds', '10', 'steps', str(100), 'finished'), msgBody),
             (('steps', str(100), 'finished'), msgBody),
         ])
         step = yield self.master.db.steps.getStep(100)
-        self.assertEqual(step, {
-            'buildid': 10,
-            'complete_at': epoch2datetime(TIME2),
-            'id': 100,
-            'name': 'ten',
-            'number': 0,
-            'results': 9,
-            'started_at': epoch2datetime(TIME1),
-            "locks_acquired_at": epoch2datetime(TIME1),
-            'state_string': 'pending',
-            'urls': [],
-            'hidden': False,
-        })
+        self.assertEqual(step, _step_model(complete_at=DT2, results=9, started_at=DT1,
+                                           locks_acquired_at=DT1))
 
     def test_signature_addStepURL(self):
         @self.assertArgSpecMatches(
@@ -431,39 +356,12 @@ class Step(TestReactorMixin, interfaces.InterfaceTests, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_addStepURL(self):
-        yield self.master.db.steps.addStep(buildid=10, name='ten',
-                                           state_string='pending')
         yield self.rtype.addStepURL(stepid=100, name="foo", url="bar")
 
-        msgBody = {
-            'buildid': 10,
-            'complete': False,
-            'complete_at': None,
-            'name': 'ten',
-            'number': 0,
-            'results': None,
-            'started_at': None,
-            "locks_acquired_at": None,
-            'state_string': 'pending',
-            'stepid': 100,
-            'urls': [{'name': 'foo', 'url': 'bar'}],
-            'hidden': False,
-        }
+        msgBody = {**_STEP_MSG_BASE, 'urls': [{'name': 'foo', 'url': 'bar'}]}
         self.master.mq.assertProductions([
             (('builds', '10', 'steps', str(100), 'updated'), msgBody),
             (('steps', str(100), 'updated'), msgBody),
         ])
         step = yield self.master.db.steps.getStep(100)
-        self.assertEqual(step, {
-            'buildid': 10,
-            'complete_at': None,
-            'id': 100,
-            'name': 'ten',
-            'number': 0,
-            'results': None,
-            'started_at': None,
-            "locks_acquired_at": None,
-            'state_string': 'pending',
-            'urls': [{'name': 'foo', 'url': 'bar'}],
-            'hidden': False,
-        })
+        self.assertEqual(step, _step_model(urls=[{'name': 'foo', 'url': 'bar'}]))
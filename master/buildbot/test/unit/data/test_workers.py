@@ -13,8 +13,11 @@
 #
 # Copyright Buildbot Team Members
 
+import copy
 from unittest import mock
 
+from parameterized import parameterized
+
 from twisted.internet import defer
 from twisted.trial import unittest
 
@@ -60,49 +63,61 @@ def configuredOnKey(worker):
 
 
 def _filt(bs, builderid, masterid):
-    bs['connected_to'] = sorted(
-        [d for d in bs['connected_to']
-         if not masterid or masterid == d['masterid']])
-    bs['configured_on'] = sorted(
-        [d for d in bs['configured_on']
-         if (not masterid or masterid == d['masterid'])
-         and (not builderid or builderid == d['builderid'])], key=configuredOnKey)
+    # filtering preserves the order of the lists, which are already sorted
+    bs['connected_to'] = [d for d in bs['connected_to']
+                          if not masterid or masterid == d['masterid']]
+    bs['configured_on'] = [d for d in bs['configured_on']
+                           if (not masterid or masterid == d['masterid'])
+                           and (not builderid or builderid == d['builderid'])]
     return bs
 
 
+_W1_BASE = {
+    'workerid': 1,
+    'name': 'linux',
+    'workerinfo': {},
+    'paused': False,
+    'graceful': False,
+    'connected_to': [
+        {'masterid': 13},
+    ],
+    'configured_on': sorted([
+        {'builderid': 40, 'masterid': 13},
+        {'builderid': 40, 'masterid': 14},
+    ], key=configuredOnKey),
+}
+
+_W2_BASE = {
+    'workerid': 2,
+    'name': 'windows',
+    'workerinfo': {'a': 'b'},
+    'paused': False,
+    'graceful': False,
+    'connected_to': [
+        {'masterid': 14},
+    ],
+    'configured_on': sorted([
+        {'builderid': 40, 'masterid': 13},
+        {'builderid': 41, 'masterid': 13},
+        {'builderid': 40, 'masterid': 14},
+    ], key=configuredOnKey),
+}
+
+
 def w1(builderid=None, masterid=None):
-    return _filt({
-        'workerid': 1,
-        'name': 'linux',
-        'workerinfo': {},
-        'paused': False,
-        'graceful': False,
-        'connected_to': [
-            {'masterid': 13},
-        ],
-        'configured_on': sorted([
-            {'builderid': 40, 'masterid': 13},
-            {'builderid': 40, 'masterid': 14},
-        ], key=configuredOnKey),
-    }, builderid, masterid)
+    # _filt modifies the dict in place, so hand it a copy
+    return _filt(copy.deepcopy(_W1_BASE), builderid, masterid)
 
 
 def w2(builderid=None, masterid=None):
-    return _filt({
-        'workerid': 2,
-        'name': 'windows',
-        'workerinfo': {'a': 'b'},
-        'paused': False,
-        'graceful': False,
-        'connected_to': [
-            {'masterid': 14},
-        ],
-        'configured_on': sorted([
-            {'builderid': 40, 'masterid': 13},
-            {'builderid': 41, 'masterid': 13},
-            {'builderid': 40, 'masterid': 14},
-        ], key=configuredOnKey),
-    }, builderid, masterid)
+    return _filt(copy.deepcopy(_W2_BASE), builderid, masterid)
+
+
+# expected results of the WorkersEndpoint tests, sorted with configuredOnKey
+_EXPECTED_ALL = sorted([w1(), w2()], key=configuredOnKey)
+_EXPECTED_MASTER13 = sorted([w1(masterid=13), w2(masterid=13)], key=configuredOnKey)
+_EXPECTED_BUILDER41 = [w2(builderid=41)]
+_EXPECTED_MASTER13_BUILDER41 = [w2(masterid=13, builderid=41)]
 
 
 class WorkerEndpoint(endpoint.EndpointMixin, unittest.TestCase):
@@ -175,12 +190,12 @@ class WorkerEndpoint(endpoint.EndpointMixin, unittest.TestCase):
         self.validateData(worker)
         self.assertEqual(worker['paused'], True)
 
+    @parameterized.expand(["stop", "pause", "unpause", "kill"])
     @defer.inlineCallbacks
-    def test_actions(self):
-        for action in ("stop", "pause", "unpause", "kill"):
-            yield self.callControl(action, {}, ('masters', 13, 'builders', 40, 'workers', 2))
-            self.master.mq.assertProductions(
-                [(('control', 'worker', '2', action), {'reason': 'no reason'})])
+    def test_actions(self, action):
+        yield self.callControl(action, {}, ('masters', 13, 'builders', 40, 'workers', 2))
+        self.master.mq.assertProductions(
+            [(('control', 'worker', '2', action), {'reason': 'no reason'})])
 
     @defer.inlineCallbacks
     def test_bad_actions(self):
@@ -209,8 +224,8 @@ class WorkersEndpoint(endpoint.EndpointMixin, unittest.TestCase):
             self.validateData(b)
             b['configured_on'] = sorted(b['configured_on'],
                                         key=configuredOnKey)
-        self.assertEqual(sorted(workers, key=configuredOnKey),
-                         sorted([w1(), w2()], key=configuredOnKey))
+        workers.sort(key=configuredOnKey)
+        self.assertEqual(workers, _EXPECTED_ALL)
 
     @defer.inlineCallbacks
     def test_get_masterid(self):
@@ -219,8 +234,8 @@ class WorkersEndpoint(endpoint.EndpointMixin, unittest.TestCase):
         for b in workers:
             self.validateData(b)
 
-        self.assertEqual(sorted(workers, key=configuredOnKey),
-                         sorted([w1(masterid=13), w2(masterid=13)], key=configuredOnKey))
+        workers.sort(key=configuredOnKey)
+        self.assertEqual(workers, _EXPECTED_MASTER13)
 
     @defer.inlineCallbacks
     def test_get_builderid(self):
@@ -229,8 +244,8 @@ class WorkersEndpoint(endpoint.EndpointMixin, unittest.TestCase):
         for b in workers:
             self.validateData(b)
 
-        self.assertEqual(sorted(workers, key=configuredOnKey),
-                         sorted([w2(builderid=41)], key=configuredOnKey))
+        workers.sort(key=configuredOnKey)
+        self.assertEqual(workers, _EXPECTED_BUILDER41)
 
     @defer.inlineCallbacks
     def test_get_masterid_builderid(self):
@@ -240,8 +255,8 @@ class WorkersEndpoint(endpoint.EndpointMixin, unittest.TestCase):
         for b in workers:
             self.validateData(b)
 
-        self.assertEqual(sorted(workers, key=configuredOnKey),
-                         sorted([w2(masterid=13, builderid=41)], key=configuredOnKey))
+        workers.sort(key=configuredOnKey)
+        self.assertEqual(workers, _EXPECTED_MASTER13_BUILDER41)
 
     @defer.inlineCallbacks
     def test_setWorkerStateFindByPaused(self):
@@ -260,8 +275,8 @@ class Worker(TestReactorMixin, interfaces.InterfaceTests, unittest.TestCase):
 
     def setUp(self):
         self.setup_test_reactor()
-        self.master = fakemaster.make_master(self, wantMq=True, wantDb=True,
-                                             wantData=True)
+        # wantData implies a fake mq and db
+        self.master = fakemaster.make_master(self, wantData=True)
         self.rtype = workers.Worker(self.master)
         return self.master.db.insert_test_data([
             fakedb.Master(id=13),
@@ -149,6 +149,24 @@ class Tests(interfaces.InterfaceTests):
             'projectid': 107,
         })
 
+    @defer.inlineCallbacks
+    def test_update_builder_info_change_tags(self):
+        yield self.insert_test_data([
+            fakedb.Builder(id=7, name='some:builder7'),
+        ])
+
+        yield self.db.builders.updateBuilderInfo(7, 'builder_desc', None, None, None,
+                                                 ['cat1', 'cat2'])
+        yield self.db.builders.updateBuilderInfo(7, 'builder_desc', None, None, None,
+                                                 ['cat2', 'cat3'])
+        builder_dict = yield self.db.builders.getBuilder(7)
+        validation.verifyDbDict(self, 'builderdict', builder_dict)
+        self.assertEqual(sorted(builder_dict['tags']), ['cat2', 'cat3'])
+
+        yield self.db.builders.updateBuilderInfo(7, 'builder_desc', None, None, None, [])
+        builder_dict = yield self.db.builders.getBuilder(7)
+        self.assertEqual(builder_dict['tags'], [])
+
     @defer.inlineCallbacks
     def test_findBuilderId_new(self):
         id = yield self.db.builders.findBuilderId('some:builder')
@@ -435,6 +453,33 @@ class Tests(interfaces.InterfaceTests):
             },
         ], key=builderKey))
 
+    @defer.inlineCallbacks
+    def test_getBuilders_tags(self):
+        yield self.insert_test_data([
+            fakedb.Project(id=201, name="p201"),
+            fakedb.Builder(id=7, name='some:builder', projectid=201),
+            fakedb.Builder(id=8, name='other:builder'),
+            fakedb.Master(id=3, name='m1'),
+            fakedb.Master(id=4, name='m2'),
+            fakedb.BuilderMaster(builderid=7, masterid=3),
+            fakedb.BuilderMaster(builderid=8, masterid=4),
+        ])
+        yield self.db.builders.updateBuilderInfo(7, None, None, None, 201, ['tag1'])
+        yield self.db.builders.updateBuilderInfo(8, None, None, None, None, ['tag2'])
+
+        builderdict = yield self.db.builders.getBuilder(8)
+        self.assertEqual(builderdict['tags'], ['tag2'])
+
+        builderlist = yield self.db.builders.getBuilders(masterid=3)
+        self.assertEqual([(b['id'], b['tags']) for b in builderlist], [(7, ['tag1'])])
+
+        builderlist = yield self.db.builders.getBuilders(projectid=201)
+        self.assertEqual([(b['id'], b['tags']) for b in builderlist], [(7, ['tag1'])])
+
+        builderlist = yield self.db.builders.getBuilders()
+        self.assertEqual(sorted((b['id'], b['tags']) for b in builderlist),
+                         [(7, ['tag1']), (8, ['tag2'])])
+
     @defer.inlineCallbacks
     def test_getBuilders_empty(self):
         builderlist = yield self.db.builders.getBuilders()
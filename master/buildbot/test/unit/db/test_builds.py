@@ -29,6 +29,10 @@ TIME2 = 1304262223
 TIME3 = 1304262224
 TIME4 = 1304262235
 CREATED_AT = 927845299
+DT1 = epoch2datetime(TIME1)
+DT2 = epoch2datetime(TIME2)
+DT3 = epoch2datetime(TIME3)
+DT4 = epoch2datetime(TIME4)
 
 
 class Tests(interfaces.InterfaceTests):
@@ -63,22 +67,24 @@ class Tests(interfaces.InterfaceTests):
     threeBdicts = {
         50: {'id': 50, 'buildrequestid': 42, 'builderid': 77,
              'masterid': 88, 'number': 5, 'workerid': 13,
-             'started_at': epoch2datetime(TIME1),
+             'started_at': DT1,
              'complete_at': None, 'state_string': 'build 5',
              'results': None},
         51: {'id': 51, 'buildrequestid': 41, 'builderid': 88,
              'masterid': 88, 'number': 6, 'workerid': 13,
-             'started_at': epoch2datetime(TIME2),
+             'started_at': DT2,
              'complete_at': None, 'state_string': 'build 6',
              'results': None},
         52: {'id': 52, 'buildrequestid': 42, 'builderid': 77,
              'masterid': 88, 'number': 7, 'workerid': 12,
-             'started_at': epoch2datetime(TIME3),
-             'complete_at': epoch2datetime(TIME4),
+             'started_at': DT3,
+             'complete_at': DT4,
              'state_string': 'build 7',
              'results': 5},
     }
 
+    allData = backgroundData + threeBuilds
+
     # signature tests
 
     def test_signature_getBuild(self):
@@ -137,7 +143,7 @@ class Tests(interfaces.InterfaceTests):
             "masterid": 88,
             "builderid": 77,
             "workerid": 13,
-            "started_at": epoch2datetime(TIME1),
+            "started_at": DT1,
             "complete_at": None,
             "state_string": 'build 5',
             "results": None
@@ -157,40 +163,37 @@ class Tests(interfaces.InterfaceTests):
 
     @defer.inlineCallbacks
     def test_getBuilds(self):
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds()
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
+        self.assertEqual(bdicts,
                          [self.threeBdicts[50], self.threeBdicts[51],
                           self.threeBdicts[52]])
 
     @defer.inlineCallbacks
     def test_getBuilds_builderid(self):
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(builderid=88)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[51]])
+        self.assertEqual(bdicts, [self.threeBdicts[51]])
 
     @defer.inlineCallbacks
     def test_getBuilds_buildrequestid(self):
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(buildrequestid=42)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[50], self.threeBdicts[52]])
+        self.assertEqual(bdicts, [self.threeBdicts[50], self.threeBdicts[52]])
 
     @defer.inlineCallbacks
     def test_getBuilds_workerid(self):
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(workerid=13)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[50], self.threeBdicts[51]])
+        self.assertEqual(bdicts, [self.threeBdicts[50], self.threeBdicts[51]])
 
     def test_signature_getBuildsForChange(self):
         @self.assertArgSpecMatches(self.db.builds.getBuildsForChange)
@@ -238,12 +241,11 @@ class Tests(interfaces.InterfaceTests):
 
     @defer.inlineCallbacks
     def test_getBuilds_complete(self):
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(complete=True)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[52]])
+        self.assertEqual(bdicts, [self.threeBdicts[52]])
 
     @defer.inlineCallbacks
     def test_addBuild_first(self):
@@ -257,7 +259,7 @@ class Tests(interfaces.InterfaceTests):
         validation.verifyDbDict(self, 'dbbuilddict', bdict)
         self.assertEqual(bdict, {'buildrequestid': 41, 'builderid': 77,
                                  'id': id, 'masterid': 88, 'number': number, 'workerid': 13,
-                                 'started_at': epoch2datetime(TIME1),
+                                 'started_at': DT1,
                                  'complete_at': None, 'state_string': 'test test2',
                                  'results': None})
 
@@ -277,7 +279,7 @@ class Tests(interfaces.InterfaceTests):
         self.assertEqual(number, 11)
         self.assertEqual(bdict, {'buildrequestid': 41, 'builderid': 77,
                                  'id': id, 'masterid': 88, 'number': number, 'workerid': 13,
-                                 'started_at': epoch2datetime(TIME1),
+                                 'started_at': DT1,
                                  'complete_at': None, 'state_string': 'test test2',
                                  'results': None})
 
@@ -295,7 +297,7 @@ class Tests(interfaces.InterfaceTests):
             "masterid": 88,
             "builderid": 77,
             "workerid": 13,
-            "started_at": epoch2datetime(TIME1),
+            "started_at": DT1,
             "complete_at": None,
             "state_string": 'test test2',
             "results": None
@@ -315,15 +317,15 @@ class Tests(interfaces.InterfaceTests):
             "masterid": 88,
             "builderid": 77,
             "workerid": 13,
-            "started_at": epoch2datetime(TIME1),
-            "complete_at": epoch2datetime(TIME4),
+            "started_at": DT1,
+            "complete_at": DT4,
             "state_string": 'build 5',
             "results": 7
         })
 
     @defer.inlineCallbacks
     def testgetBuildPropertiesEmpty(self):
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         for buildid in (50, 51, 52):
             props = yield self.db.builds.getBuildProperties(buildid)
             self.assertEqual(0, len(props))
@@ -333,7 +335,7 @@ class Tests(interfaces.InterfaceTests):
         rs = resultspec.ResultSpec(
             filters=[resultspec.Filter('name', 'eq', ["prop", "prop2"])])
         rs.fieldMapping = {'name': 'build_properties.name'}
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         yield self.db.builds.setBuildProperty(50, 'prop', 42, 'test')
         yield self.db.builds.setBuildProperty(50, 'prop2', 43, 'test')
         yield self.db.builds.setBuildProperty(50, 'prop3', 44, 'test')
@@ -353,14 +355,14 @@ class Tests(interfaces.InterfaceTests):
 
     @defer.inlineCallbacks
     def testsetandgetProperties(self):
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         yield self.db.builds.setBuildProperty(50, 'prop', 42, 'test')
         props = yield self.db.builds.getBuildProperties(50)
         self.assertEqual(props, {'prop': (42, 'test')})
 
     @defer.inlineCallbacks
     def testsetgetsetProperties(self):
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         props = yield self.db.builds.getBuildProperties(50)
         self.assertEqual(props, {})
         yield self.db.builds.setBuildProperty(50, 'prop', 42, 'test')
@@ -387,16 +389,18 @@ class RealTests(Tests):
         self.reactor.advance(TIME1)
         yield self.insert_test_data(self.backgroundData)
 
-        # add new builds at *just* the wrong time, repeatedly
-        numbers = list(range(1, 8))
+        # add new builds at *just* the wrong time, so that the next seven numbers are taken
+        raced = []
 
         def raceHook(conn):
-            if not numbers:
+            if raced:
                 return
+            raced.append(True)
             conn.execute(self.db.model.builds.insert(),
-                         {'number': numbers.pop(0), 'buildrequestid': 41,
-                          'masterid': 88, 'workerid': 13, 'builderid': 77,
-                          'started_at': TIME1, 'state_string': "hi"})
+                         [{'number': number, 'buildrequestid': 41,
+                           'masterid': 88, 'workerid': 13, 'builderid': 77,
+                           'started_at': TIME1, 'state_string': "hi"}
+                          for number in range(1, 8)])
 
         id, number = yield self.db.builds.addBuild(builderid=77,
                                                    buildrequestid=41,
@@ -408,7 +412,7 @@ class RealTests(Tests):
         self.assertEqual(number, 8)
         self.assertEqual(bdict, {'buildrequestid': 41, 'builderid': 77,
                                  'id': id, 'masterid': 88, 'number': number, 'workerid': 13,
-                                 'started_at': epoch2datetime(TIME1),
+                                 'started_at': DT1,
                                  'complete_at': None, 'state_string': 'test test2',
                                  'results': None})
 
@@ -417,18 +421,17 @@ class RealTests(Tests):
         rs = resultspec.ResultSpec(
             filters=[resultspec.Filter('complete_at', 'ne', [None])])
         rs.fieldMapping = {'complete_at': 'builds.complete_at'}
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(resultSpec=rs)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[52]])
+        self.assertEqual(bdicts, [self.threeBdicts[52]])
 
     @defer.inlineCallbacks
     def test_getBuilds_resultSpecOrder(self):
         rs = resultspec.ResultSpec(order=['-started_at'])
         rs.fieldMapping = {'started_at': 'builds.started_at'}
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(resultSpec=rs)
 
         # applying the spec in the db layer should have emptied the order in
@@ -450,7 +453,7 @@ class RealTests(Tests):
     def test_getBuilds_limit(self):
         rs = resultspec.ResultSpec(order=['-started_at'], limit=1, offset=2)
         rs.fieldMapping = {'started_at': 'builds.started_at'}
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(resultSpec=rs)
         # applying the spec in the db layer should have emptied the limit and
         # offset in resultSpec
@@ -469,48 +472,44 @@ class RealTests(Tests):
         rs = resultspec.ResultSpec(
             filters=[resultspec.Filter('number', 'eq', [6, 7])])
         rs.fieldMapping = {'number': 'builds.number'}
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(resultSpec=rs)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[51], self.threeBdicts[52]])
+        self.assertEqual(bdicts, [self.threeBdicts[51], self.threeBdicts[52]])
 
     @defer.inlineCallbacks
     def test_getBuilds_resultSpecFilterNeTwoValues(self):
         rs = resultspec.ResultSpec(
             filters=[resultspec.Filter('number', 'ne', [6, 7])])
         rs.fieldMapping = {'number': 'builds.number'}
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(resultSpec=rs)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[50]])
+        self.assertEqual(bdicts, [self.threeBdicts[50]])
 
     @defer.inlineCallbacks
     def test_getBuilds_resultSpecFilterContainsOneValue(self):
         rs = resultspec.ResultSpec(
             filters=[resultspec.Filter('state_string', 'contains', ['7'])])
         rs.fieldMapping = {'state_string': 'builds.state_string'}
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(resultSpec=rs)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[52]])
+        self.assertEqual(bdicts, [self.threeBdicts[52]])
 
     @defer.inlineCallbacks
     def test_getBuilds_resultSpecFilterContainsTwoValues(self):
         rs = resultspec.ResultSpec(
             filters=[resultspec.Filter('state_string', 'contains', ['build 5', 'build 6'])])
         rs.fieldMapping = {'state_string': 'builds.state_string'}
-        yield self.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.insert_test_data(self.allData)
         bdicts = yield self.db.builds.getBuilds(resultSpec=rs)
         for bdict in bdicts:
             validation.verifyDbDict(self, 'dbbuilddict', bdict)
-        self.assertEqual(sorted(bdicts, key=lambda bd: bd['id']),
-                         [self.threeBdicts[50], self.threeBdicts[51]])
+        self.assertEqual(bdicts, [self.threeBdicts[50], self.threeBdicts[51]])
 
 
 class TestFakeDB(unittest.TestCase, connector_component.FakeConnectorComponentMixin, Tests):
@@ -24,10 +24,6 @@ from buildbot.test.util import interfaces
 from buildbot.test.util import validation
 
 
-def changeSourceKey(changeSource):
-    return changeSource['id']
-
-
 class Tests(interfaces.InterfaceTests):
 
     # test data
@@ -185,10 +181,10 @@ class Tests(interfaces.InterfaceTests):
         for cs in cslist:
             validation.verifyDbDict(self, 'changesourcedict', cs)
 
-        self.assertEqual(sorted(cslist, key=changeSourceKey), sorted([
+        self.assertCountEqual(cslist, [
             {"id": 42, "name": 'cool_source', "masterid": 13},
             {"id": 87, "name": 'lame_source', "masterid": None},
-        ], key=changeSourceKey))
+        ])
 
     @defer.inlineCallbacks
     def test_getChangeSources_masterid(self):
@@ -202,9 +198,9 @@ class Tests(interfaces.InterfaceTests):
         for cs in cslist:
             validation.verifyDbDict(self, 'changesourcedict', cs)
 
-        self.assertEqual(sorted(cslist, key=changeSourceKey), sorted([
+        self.assertCountEqual(cslist, [
             {"id": 42, "name": 'cool_source', "masterid": 13},
-        ], key=changeSourceKey))
+        ])
 
     @defer.inlineCallbacks
     def test_getChangeSources_active(self):
@@ -218,9 +214,9 @@ class Tests(interfaces.InterfaceTests):
         for cs in cslist:
             validation.verifyDbDict(self, 'changesourcedict', cs)
 
-        self.assertEqual(sorted(cslist), sorted([
+        self.assertCountEqual(cslist, [
             {"id": 42, "name": 'cool_source', "masterid": 13},
-        ]))
+        ])
 
     @defer.inlineCallbacks
     def test_getChangeSources_active_masterid(self):
@@ -229,23 +225,18 @@ class Tests(interfaces.InterfaceTests):
             self.cs42, self.master13, self.cs42master13,
             self.cs87
         ])
-        cslist = yield self.db.changesources.getChangeSources(
-            active=True, masterid=13)
+        cslist13, cslist14 = yield defer.gatherResults([
+            self.db.changesources.getChangeSources(active=True, masterid=13),
+            self.db.changesources.getChangeSources(active=True, masterid=14),
+        ])
 
-        for cs in cslist:
+        for cs in cslist13 + cslist14:
             validation.verifyDbDict(self, 'changesourcedict', cs)
 
-        self.assertEqual(sorted(cslist), sorted([
+        self.assertCountEqual(cslist13, [
             {"id": 42, "name": 'cool_source', "masterid": 13},
-        ]))
-
-        cslist = yield self.db.changesources.getChangeSources(
-            active=True, masterid=14)
-
-        for cs in cslist:
-            validation.verifyDbDict(self, 'changesourcedict', cs)
-
-        self.assertEqual(sorted(cslist), [])
+        ])
+        self.assertEqual(cslist14, [])
 
     @defer.inlineCallbacks
     def test_getChangeSources_inactive(self):
@@ -259,9 +250,9 @@ class Tests(interfaces.InterfaceTests):
         for cs in cslist:
             validation.verifyDbDict(self, 'changesourcedict', cs)
 
-        self.assertEqual(sorted(cslist), sorted([
+        self.assertCountEqual(cslist, [
             {"id": 87, "name": 'lame_source', "masterid": None},
-        ]))
+        ])
 
     @defer.inlineCallbacks
     def test_getChangeSources_inactive_masterid(self):
@@ -270,21 +261,17 @@ class Tests(interfaces.InterfaceTests):
             self.cs42, self.master13, self.cs42master13,
             self.cs87
         ])
-        cslist = yield self.db.changesources.getChangeSources(
-            active=False, masterid=13)
-
-        for cs in cslist:
-            validation.verifyDbDict(self, 'changesourcedict', cs)
-
-        self.assertEqual(sorted(cslist), [])
-
-        cslist = yield self.db.changesources.getChangeSources(
-            active=False, masterid=14)
+        cslist13, cslist14 = yield defer.gatherResults([
+            self.db.changesources.getChangeSources(active=False, masterid=13),
+            self.db.changesources.getChangeSources(active=False, masterid=14),
+        ])
 
-        for cs in cslist:
+        for cs in cslist13 + cslist14:
             validation.verifyDbDict(self, 'changesourcedict', cs)
 
-        self.assertEqual(sorted(cslist), [])   # always returns [] by spec!
+        # always returns [] by spec!
+        self.assertEqual(cslist13, [])
+        self.assertEqual(cslist14, [])
 
 
 class RealTests(Tests):
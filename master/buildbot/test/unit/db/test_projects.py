@@ -23,10 +23,6 @@ from buildbot.test.util import interfaces
 from buildbot.test.util import validation
 
 
-def project_key(builder):
-    return builder['id']
-
-
 class Tests(interfaces.InterfaceTests):
 
     def test_signature_find_project_id(self):
@@ -137,7 +133,7 @@ class Tests(interfaces.InterfaceTests):
         dblist = yield self.db.projects.get_projects()
         for dbdict in dblist:
             validation.verifyDbDict(self, 'projectdict', dbdict)
-        self.assertEqual(sorted(dblist, key=project_key), sorted([
+        self.assertCountEqual(dblist, [
             {
                 "id": 7,
                 "name": "fake_project7",
@@ -162,7 +158,7 @@ class Tests(interfaces.InterfaceTests):
                 "description_format": None,
                 "description_html": None,
             },
-        ], key=project_key))
+        ])
 
     @defer.inlineCallbacks
     def test_get_projects_empty(self):
@@ -325,6 +325,80 @@ class TestBuildRequestCollapser(TestReactorMixin, unittest.TestCase):
         yield self.do_request_collapse(rows, [22], [])
         yield self.do_request_collapse(rows, [21], [20])
 
+    @defer.inlineCallbacks
+    def test_canBeCollapsed_fetch_cache_is_shared(self):
+        rows = [
+            fakedb.Builder(id=77, name='A'),
+        ]
+        rows += self.makeBuildRequestRows(21, 121, None, 221, 'C')
+        rows += self.makeBuildRequestRows(20, 120, None, 220, 'C')
+        rows += self.makeBuildRequestRows(19, 119, None, 219, 'C')
+        yield self.master.db.insert_test_data(rows)
+
+        br21, br20, br19 = yield defer.gatherResults([
+            self.master.data.get(('buildrequests', brid)) for brid in [21, 20, 19]
+        ])
+
+        fetched_paths = []
+        orig_get = self.master.data.get
+
+        def get(path, *args, **kwargs):
+            fetched_paths.append(path)
+            return orig_get(path, *args, **kwargs)
+
+        self.patch(self.master.data, 'get', get)
+
+        fetch_cache = {}
+        res = yield buildrequest.BuildRequest.canBeCollapsed(self.master, br21, br20,
+                                                             fetch_cache=fetch_cache)
+        self.assertTrue(res)
+        res = yield buildrequest.BuildRequest.canBeCollapsed(self.master, br21, br19,
+                                                             fetch_cache=fetch_cache)
+        self.assertTrue(res)
+
+        # the data of buildrequest 21 has been fetched only once
+        self.assertEqual(len(fetched_paths), len(set(fetched_paths)))
+        self.assertIn(('buildsets', '121', 'properties'), fetch_cache)
+
+    @defer.inlineCallbacks
+    def test_canBeCollapsed_different_branches_fetches_no_changes(self):
+        rows = [
+            fakedb.Builder(id=77, name='A'),
+        ]
+        rows += self.makeBuildRequestRows(21, 121, 123, 221, 'C', 'br1')
+        rows += self.makeBuildRequestRows(20, 120, 124, 220, 'C', 'br2')
+        yield self.master.db.insert_test_data(rows)
+
+        br21, br20 = yield defer.gatherResults([
+            self.master.data.get(('buildrequests', brid)) for brid in [21, 20]
+        ])
+
+        fetch_cache = {}
+        res = yield buildrequest.BuildRequest.canBeCollapsed(self.master, br21, br20,
+                                                             fetch_cache=fetch_cache)
+        self.assertFalse(res)
+        self.assertEqual(sorted(fetch_cache), [('buildsets', '120'), ('buildsets', '121')])
+
+    @defer.inlineCallbacks
+    def test_canBeCollapsed_different_revisions_fetches_no_properties(self):
+        rows = [
+            fakedb.Builder(id=77, name='A'),
+        ]
+        rows += self.makeBuildRequestRows(21, 121, None, 221, 'C', revision='abcd1234')
+        rows += self.makeBuildRequestRows(20, 120, None, 220, 'C', revision='1234abcd')
+        yield self.master.db.insert_test_data(rows)
+
+        br21, br20 = yield defer.gatherResults([
+            self.master.data.get(('buildrequests', brid)) for brid in [21, 20]
+        ])
+
+        fetch_cache = {}
+        res = yield buildrequest.BuildRequest.canBeCollapsed(self.master, br21, br20,
+                                                             fetch_cache=fetch_cache)
+        self.assertFalse(res)
+        self.assertNotIn(('buildsets', '120', 'properties'), fetch_cache)
+        self.assertNotIn(('buildsets', '121', 'properties'), fetch_cache)
+
 
 class TestSourceStamp(unittest.TestCase):
     def test_asdict_minimal(self):
@@ -412,6 +486,56 @@ class TestSourceStamp(unittest.TestCase):
             'revision': 'testrev'
         })
 
+    def test_patch_attributes(self):
+        ss = buildrequest.TempSourceStamp({
+            'ssid': '123',
+            'patch': {
+                'patchid': 1234,
+                'body': b'testbody',
+                'level': 2,
+                'author': 'testauthor',
+                'comment': 'testcomment',
+                'subdir': 'testsubdir',
+            },
+        })
+        self.assertEqual(ss.patch, (2, b'testbody', 'testsubdir'))
+        self.assertEqual(ss.patch_info, ('testauthor', 'testcomment'))
+
+        ss = buildrequest.TempSourceStamp({'ssid': '123', 'patch': None})
+        self.assertIsNone(ss.patch)
+        self.assertEqual(ss.patch_info, (None, None))
+
+    def test_asdict_returns_copy(self):
+        ssdatadict = {
+            'ssid': '123',
+            'branch': 'testbranch',
+            'revision': 'testrev',
+            'patch': None,
+            'repository': 'testrepo',
+            'codebase': 'testcodebase',
+            'project': 'testproject',
+            'created_at': datetime.datetime(2019, 4, 1, 23, 38, 33, 154354),
+        }
+        ss = buildrequest.TempSourceStamp(ssdatadict)
+
+        ss.asDict()['revision'] = 'otherrev'
+        self.assertEqual(ss.asDict()['revision'], 'testrev')
+
+
+class TestChange(unittest.TestCase):
+    def test_attributes(self):
+        change = buildrequest.TempChange({
+            'changeid': 13,
+            'author': 'me',
+            'files': ['main.c'],
+            'properties': {'prop': ('value', 'Change')},
+        })
+        self.assertEqual(change.changeid, 13)
+        self.assertEqual(change.who, 'me')
+        self.assertEqual(change.files, ['main.c'])
+        self.assertEqual(change.properties.getProperty('prop'), 'value')
+        self.assertIs(change.properties, change.properties)
+
 
 class TestBuildRequest(TestReactorMixin, unittest.TestCase):
 
@@ -409,6 +409,12 @@ class TestDataUtils(TestReactorMixin, unittest.TestCase, logging.LoggingMixin):
         res = yield utils.getResponsibleUsersForSourceStamp(self.master, 235)
         self.assertEqual(res, ["him@foo"])
 
+    @defer.inlineCallbacks
+    def test_getResponsibleUsersForSourceStamps(self):
+        self.setupDb()
+        res = yield utils.getResponsibleUsersForSourceStamps(self.master, [234, 235])
+        self.assertEqual(res, {234: ["me@foo"], 235: ["him@foo"]})
+
     @defer.inlineCallbacks
     def test_getResponsibleUsersForBuild(self):
         self.setupDb()
@@ -451,6 +457,25 @@ class TestDataUtils(TestReactorMixin, unittest.TestCase, logging.LoggingMixin):
         res = yield utils.getPreviousBuild(self.master, build)
         self.assertEqual(res['buildid'], 18)
 
+    @defer.inlineCallbacks
+    def test_getPreviousBuildWithManyRetries(self):
+        self.setupDb()
+        self.db.insert_test_data([
+            fakedb.Build(id=30 + number, number=number, builderid=80, buildrequestid=12,
+                         workerid=13, masterid=92, results=RETRY)
+            for number in range(4, 30)
+        ])
+        build = yield self.master.data.get(("builders", 80, "builds", 29))
+        res = yield utils.getPreviousBuild(self.master, build)
+        self.assertEqual(res['buildid'], 21)
+
+    @defer.inlineCallbacks
+    def test_getPreviousBuildFirstBuild(self):
+        self.setupDb()
+        build = yield self.master.data.get(("builds", 18))
+        res = yield utils.getPreviousBuild(self.master, build)
+        self.assertIsNone(res)
+
 
 class TestURLUtils(TestReactorMixin, unittest.TestCase):
 
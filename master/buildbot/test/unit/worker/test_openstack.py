@@ -15,7 +15,7 @@
 # Portions Copyright 2013 Cray Inc.
 
 import hashlib
-from unittest import mock
+import types
 
 from twisted.internet import defer
 from twisted.trial import unittest
@@ -50,43 +50,47 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
         **os_auth
     }
 
+    masterhash = hashlib.sha1(b'fake:/master').hexdigest()[:6]
+
     def setUp(self):
         self.setup_test_reactor()
         self.patch(openstack, "client", novaclient)
         self.patch(openstack, "loading", novaclient)
         self.patch(openstack, "session", novaclient)
         self.patch(openstack, "NotFound", novaclient.NotFound)
+        # the fake servers are tracked on the class, so don't leak them between tests
+        self.patch(novaclient.Servers, "instances", {})
         self.build = Properties(image=novaclient.TEST_UUIDS['image'],
                                 flavor=novaclient.TEST_UUIDS['flavor'],
                                 meta_value='value')
-        self.masterhash = hashlib.sha1(b'fake:/master').hexdigest()[:6]
 
     @defer.inlineCallbacks
     def setupWorker(self, *args, **kwargs):
         worker = openstack.OpenStackLatentWorker(*args, **kwargs)
         master = fakemaster.make_master(self, wantData=True)
-        fakemaster.master = master
         worker.setServiceParent(master)
         yield master.startService()
         self.addCleanup(master.stopService)
         return worker
 
+    def setupDefaultWorker(self, **kwargs):
+        return self.setupWorker('bot', 'pass', **self.bs_image_args, **kwargs)
+
     @defer.inlineCallbacks
     def test_constructor_nonova(self):
         self.patch(openstack, "client", None)
         with self.assertRaises(config.ConfigErrors):
-            yield self.setupWorker('bot', 'pass', **self.bs_image_args)
+            yield self.setupDefaultWorker()
 
     @defer.inlineCallbacks
     def test_constructor_nokeystoneauth(self):
         self.patch(openstack, "loading", None)
         with self.assertRaises(config.ConfigErrors):
-            yield self.setupWorker('bot', 'pass', **self.bs_image_args)
+            yield self.setupDefaultWorker()
 
     @defer.inlineCallbacks
     def test_constructor_minimal(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         self.assertEqual(bs.workername, 'bot')
         self.assertEqual(bs.password, 'pass')
         self.assertEqual(bs.flavor, 1)
@@ -97,15 +101,12 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
     @defer.inlineCallbacks
     def test_builds_may_be_incompatible(self):
         # Minimal set of parameters
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         self.assertEqual(bs.builds_may_be_incompatible, True)
 
     @defer.inlineCallbacks
     def test_constructor_minimal_keystone_v3(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', os_user_domain='test_oud', os_project_domain='test_opd',
-            **self.bs_image_args)
+        bs = yield self.setupDefaultWorker(os_user_domain='test_oud', os_project_domain='test_opd')
         self.assertEqual(bs.workername, 'bot')
         self.assertEqual(bs.password, 'pass')
         self.assertEqual(bs.flavor, 1)
@@ -117,8 +118,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_constructor_token_keystone_v3(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', os_auth_args=self.os_auth_custom, **self.bs_image_args)
+        bs = yield self.setupDefaultWorker(os_auth_args=self.os_auth_custom)
         self.assertEqual(bs.workername, 'bot')
         self.assertEqual(bs.password, 'pass')
         self.assertEqual(bs.flavor, 1)
@@ -130,8 +130,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_constructor_region(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', region="test-region", **self.bs_image_args)
+        bs = yield self.setupDefaultWorker(region="test-region")
         self.assertEqual(bs.novaclient.client.region_name, "test-region")
 
     @defer.inlineCallbacks
@@ -216,8 +215,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_getImage_string(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         image_uuid = yield bs._getImage(self.build)
         self.assertEqual('image-uuid', image_uuid)
 
@@ -239,8 +237,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_getFlavor_string(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         flavor_uuid = yield bs._getFlavor(self.build)
         self.assertEqual(1, flavor_uuid)
 
@@ -262,15 +259,13 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_start_instance_already_exists(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
-        bs.instance = mock.Mock()
+        bs = yield self.setupDefaultWorker()
+        bs.instance = types.SimpleNamespace()
         yield self.assertFailure(bs.start_instance(self.build), ValueError)
 
     @defer.inlineCallbacks
     def test_start_instance_first_fetch_fail(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         bs._poll_resolution = 0
         self.patch(novaclient.Servers, 'fail_to_get', True)
         self.patch(novaclient.Servers, 'gets_until_disappears', 0)
@@ -279,8 +274,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_start_instance_fail_to_find(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         bs._poll_resolution = 0
         self.patch(novaclient.Servers, 'fail_to_get', True)
         yield self.assertFailure(bs.start_instance(self.build),
@@ -288,8 +282,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_start_instance_fail_to_start(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         bs._poll_resolution = 0
         self.patch(novaclient.Servers, 'fail_to_start', True)
         yield self.assertFailure(bs.start_instance(self.build),
@@ -297,8 +290,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
 
     @defer.inlineCallbacks
     def test_start_instance_success(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         bs._poll_resolution = 0
         uuid, image_uuid, time_waiting = yield bs.start_instance(self.build)
         self.assertTrue(uuid)
@@ -308,8 +300,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
     @defer.inlineCallbacks
     def test_start_instance_check_meta(self):
         meta_arg = {'some_key': 'some-value', 'BUILDBOT:instance': self.masterhash}
-        bs = yield self.setupWorker('bot', 'pass', meta=meta_arg,
-                                    **self.bs_image_args)
+        bs = yield self.setupDefaultWorker(meta=meta_arg)
         bs._poll_resolution = 0
         yield bs.start_instance(self.build)
         self.assertIn('meta', bs.instance.boot_kwargs)
@@ -318,8 +309,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
     @defer.inlineCallbacks
     def test_start_instance_check_meta_renderable(self):
         meta_arg = {'some_key': Interpolate('%(prop:meta_value)s')}
-        bs = yield self.setupWorker('bot', 'pass', meta=meta_arg,
-                                    **self.bs_image_args)
+        bs = yield self.setupDefaultWorker(meta=meta_arg)
         bs._poll_resolution = 0
         yield bs.start_instance(self.build)
         self.assertIn('meta', bs.instance.boot_kwargs)
@@ -330,8 +320,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
     def test_start_instance_check_nova_args(self):
         nova_args = {'some-key': 'some-value'}
 
-        bs = yield self.setupWorker('bot', 'pass', nova_args=nova_args,
-                                    **self.bs_image_args)
+        bs = yield self.setupDefaultWorker(nova_args=nova_args)
         bs._poll_resolution = 0
         yield bs.start_instance(self.build)
         self.assertIn('meta', bs.instance.boot_kwargs)
@@ -341,34 +330,33 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
     def test_start_instance_check_nova_args_renderable(self):
         nova_args = {'some-key': Interpolate('%(prop:meta_value)s')}
 
-        bs = yield self.setupWorker('bot', 'pass', nova_args=nova_args,
-                                    **self.bs_image_args)
+        bs = yield self.setupDefaultWorker(nova_args=nova_args)
         bs._poll_resolution = 0
         yield bs.start_instance(self.build)
         self.assertIn('meta', bs.instance.boot_kwargs)
         self.assertEquals(bs.instance.boot_kwargs['some-key'], 'value')
 
     @defer.inlineCallbacks
-    def test_interpolate_renderables_for_new_build(self):
+    def setupStartedBlockDeviceWorker(self):
+        # start a worker whose block device is rendered from the first build's properties
         build1 = Properties(image=novaclient.TEST_UUIDS['image'], block_device="some-device")
-        build2 = Properties(image="build2-image")
         block_devices = [{'uuid': Interpolate('%(prop:block_device)s'), 'volume_size': 10}]
-        bs = yield self.setupWorker(
-            'bot', 'pass', block_devices=block_devices, **self.bs_image_args)
+        bs = yield self.setupDefaultWorker(block_devices=block_devices)
         bs._poll_resolution = 0
         yield bs.start_instance(build1)
+        return bs, build1
+
+    @defer.inlineCallbacks
+    def test_interpolate_renderables_for_new_build(self):
+        bs, build1 = yield self.setupStartedBlockDeviceWorker()
+        build2 = Properties(image="build2-image")
         yield bs.stop_instance(build1)
         self.assertTrue((yield bs.isCompatibleWithBuild(build2)))
 
     @defer.inlineCallbacks
     def test_reject_incompatible_build_while_running(self):
-        build1 = Properties(image=novaclient.TEST_UUIDS['image'], block_device="some-device")
+        bs, _ = yield self.setupStartedBlockDeviceWorker()
         build2 = Properties(image="build2-image")
-        block_devices = [{'uuid': Interpolate('%(prop:block_device)s'), 'volume_size': 10}]
-        bs = yield self.setupWorker(
-            'bot', 'pass', block_devices=block_devices, **self.bs_image_args)
-        bs._poll_resolution = 0
-        yield bs.start_instance(build1)
         self.assertFalse((yield bs.isCompatibleWithBuild(build2)))
 
     @defer.inlineCallbacks
@@ -381,7 +369,7 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
         novaclient.Servers().create(['bot', novaclient.TEST_UUIDS['image'],
                                     novaclient.TEST_UUIDS['flavor']],
                                     meta={'BUILDBOT:instance': self.masterhash})
-        bs = yield self.setupWorker('bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         bs._poll_resolution = 0
         uuid, image_uuid, time_waiting = yield bs.start_instance(self.build)
         self.assertTrue(uuid)
@@ -393,50 +381,43 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
         """
         Test stopping the instance but with no instance to stop.
         """
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         bs.instance = None
         stopped = yield bs.stop_instance()
         self.assertEqual(stopped, None)
 
     @defer.inlineCallbacks
     def test_stop_instance_missing(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
-        instance = mock.Mock()
-        instance.id = 'uuid'
-        bs.instance = instance
+        bs = yield self.setupDefaultWorker()
+        bs.instance = types.SimpleNamespace(id='uuid', name='name')
         # TODO: Check log for instance not found.
-        bs.stop_instance()
+        yield bs.stop_instance()
 
     @defer.inlineCallbacks
     def test_stop_instance_fast(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         # Make instance immediately active.
         self.patch(novaclient.Servers, 'gets_until_active', 0)
         s = novaclient.Servers()
         bs.instance = inst = s.create()
         self.assertIn(inst.id, s.instances)
-        bs.stop_instance(fast=True)
+        yield bs.stop_instance(fast=True)
         self.assertNotIn(inst.id, s.instances)
 
     @defer.inlineCallbacks
     def test_stop_instance_notfast(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         # Make instance immediately active.
         self.patch(novaclient.Servers, 'gets_until_active', 0)
         s = novaclient.Servers()
         bs.instance = inst = s.create()
         self.assertIn(inst.id, s.instances)
-        bs.stop_instance(fast=False)
+        yield bs.stop_instance(fast=False)
         self.assertNotIn(inst.id, s.instances)
 
     @defer.inlineCallbacks
     def test_stop_instance_unknown(self):
-        bs = yield self.setupWorker(
-            'bot', 'pass', **self.bs_image_args)
+        bs = yield self.setupDefaultWorker()
         # Make instance immediately active.
         self.patch(novaclient.Servers, 'gets_until_active', 0)
         s = novaclient.Servers()
@@ -445,5 +426,5 @@ class TestOpenStackWorker(TestReactorMixin, unittest.TestCase):
         # down as it already is.
         inst.status = novaclient.DELETED
         self.assertIn(inst.id, s.instances)
-        bs.stop_instance()
+        yield bs.stop_instance()
         self.assertIn(inst.id, s.instances)
@@ -15,7 +15,6 @@
 
 import json
 import os
-import webbrowser
 from unittest import mock
 
 import twisted
@@ -84,22 +83,23 @@ class OAuth2Auth(TestReactorMixin, www.WwwTestMixin, ConfigErrorsMixin,
             "https://gitlab.test/", "glclientID", "clientSECRET")
         self.bitbucketAuth = oauth2.BitbucketAuth("bbclientID", "clientSECRET")
 
-        for auth in [self.googleAuth, self.githubAuth, self.githubAuth_v4, self.githubAuth_v4_teams,
-                     self.githubAuthEnt, self.gitlabAuth, self.bitbucketAuth,
-                     self.githubAuthEnt_v4]:
-            self._master = master = self.make_master(url='h:/a/b/', auth=auth)
-            auth.reconfigAuth(master, master.config)
-
         self.githubAuth_secret = oauth2.GitHubAuth(
             Secret("client-id"), Secret("client-secret"), apiVersion=4)
-        self._master = master = self.make_master(url='h:/a/b/', auth=auth)
+
+        # the auth objects only take the master and buildbotURL from reconfigAuth, so they can
+        # all share a single fake master
+        self._master = master = self.make_master(url='h:/a/b/', auth=self.githubAuth)
         fake_storage_service = FakeSecretStorage()
         fake_storage_service.reconfigService(secretdict={"client-id": "secretClientId",
                                                          "client-secret": "secretClientSecret"})
         secret_service = SecretManager()
         secret_service.services = [fake_storage_service]
         yield secret_service.setServiceParent(self._master)
-        self.githubAuth_secret.reconfigAuth(master, master.config)
+
+        for auth in [self.googleAuth, self.githubAuth, self.githubAuth_v4, self.githubAuth_v4_teams,
+                     self.githubAuthEnt, self.gitlabAuth, self.bitbucketAuth,
+                     self.githubAuthEnt_v4, self.githubAuth_secret]:
+            auth.reconfigAuth(master, master.config)
 
     @defer.inlineCallbacks
     def test_getGoogleLoginURL(self):
@@ -530,19 +530,17 @@ class OAuth2AuthGitHubE2E(TestReactorMixin, www.WwwTestMixin,
                           unittest.TestCase):
     authClass = "GitHubAuth"
 
+    if requests is None:
+        skip = "Need to install requests to test oauth2"
+    elif "OAUTHCONF" not in os.environ:
+        skip = "Need to pass OAUTHCONF path to json file via environ to run this e2e test"
+
     def _instantiateAuth(self, cls, config):
         return cls(config["CLIENTID"], config["CLIENTSECRET"])
 
     def setUp(self):
         self.setup_test_reactor()
 
-        if requests is None:
-            raise unittest.SkipTest("Need to install requests to test oauth2")
-
-        if "OAUTHCONF" not in os.environ:
-            raise unittest.SkipTest(
-                "Need to pass OAUTHCONF path to json file via environ to run this e2e test")
-
         with open(os.environ['OAUTHCONF'], encoding='utf-8') as f:
             jsonData = f.read()
         config = json.loads(jsonData)[self.authClass]
@@ -567,6 +565,8 @@ class OAuth2AuthGitHubE2E(TestReactorMixin, www.WwwTestMixin,
 
     @defer.inlineCallbacks
     def test_E2E(self):
+        import webbrowser
+
         d = defer.Deferred()
         twisted.web.http._logDateTimeUsers = 1
 
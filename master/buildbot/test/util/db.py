@@ -14,8 +14,10 @@
 # Copyright Buildbot Team Members
 
 
+import itertools
 import os
 
+import sqlalchemy as sa
 from sqlalchemy.schema import MetaData
 
 from twisted.internet import defer
@@ -234,21 +236,35 @@ class RealDatabaseMixin:
         self.basedir = basedir
         self.db_engine = enginestrategy.create_engine(self.db_url,
                                                       basedir=basedir)
+        if self.db_engine.dialect.name == 'sqlite' and self.db_engine.url.database:
+            # the test database is thrown away afterwards, so don't wait for the disk
+            def connect_listener(connection, record):
+                connection.execute("pragma synchronous = off")
+
+            sa.event.listen(self.db_engine.pool, 'connect', connect_listener)
+
         # if the caller does not want a pool, we're done.
         if not want_pool:
             return None
 
         self.db_pool = pool.DBThreadPool(self.db_engine, reactor=reactor)
 
-        log.msg(f"cleaning database {self.db_url}")
-        yield self.db_pool.do(self.__thd_clean_database)
+        # each engine gets its own in-memory sqlite database, which is gone once the pool
+        # disposes of the engine, so there is nothing to clean up in that case
+        self.__clean_database = \
+            self.db_engine.dialect.name != 'sqlite' or bool(self.db_engine.url.database)
+
+        if self.__clean_database:
+            log.msg(f"cleaning database {self.db_url}")
+            yield self.db_pool.do(self.__thd_clean_database)
         yield self.db_pool.do(self.__thd_create_tables, table_names)
         return None
 
     @defer.inlineCallbacks
     def tearDownRealDatabase(self):
         if self.__want_pool:
-            yield self.db_pool.do(self.__thd_clean_database)
+            if self.__clean_database:
+                yield self.db_pool.do(self.__thd_clean_database)
             yield self.db_pool.shutdown()
 
     @defer.inlineCallbacks
@@ -268,12 +284,15 @@ class RealDatabaseMixin:
         def thd(conn):
             # insert into tables -- in order
             for tbl in ordered_tables:
-                for row in [r for r in rows if r.table == tbl.name]:
-                    tbl = model.Model.metadata.tables[row.table]
+                table_rows = [r for r in rows if r.table == tbl.name]
+                # consecutive rows setting the same columns are inserted with a single
+                # executemany
+                for _, batch in itertools.groupby(table_rows, key=lambda r: tuple(r.values)):
+                    values = [row.values for row in batch]
                     try:
-                        tbl.insert(bind=conn).execute(row.values)
+                        conn.execute(tbl.insert(), values)
                     except Exception:
-                        log.msg(f"while inserting {row} - {row.values}")
+                        log.msg(f"while inserting into {tbl.name} - {values}")
                         raise
         yield self.db_pool.do(thd)
 
@@ -14,6 +14,7 @@
 # Copyright Buildbot Team Members
 
 
+import functools
 import inspect
 from collections import OrderedDict
 
@@ -21,6 +22,23 @@ import zope.interface.interface
 from zope.interface.interface import Attribute
 
 
+@functools.lru_cache(maxsize=None)
+def _function_signature(func):
+    return inspect.signature(func)
+
+
+def _signature(func):
+    # Bound methods are created anew for each test instance, but the functions underneath are
+    # shared by the whole test run, so only those are cached.
+    if inspect.ismethod(func):
+        signature = _function_signature(func.__func__)
+        parameters = list(signature.parameters.values())
+        if parameters and parameters[0].kind != inspect.Parameter.VAR_POSITIONAL:
+            parameters = parameters[1:]
+        return signature.replace(parameters=parameters)
+    return inspect.signature(func)
+
+
 class InterfaceTests:
 
     # assertions
@@ -63,8 +81,7 @@ class InterfaceTests:
                 return func
 
         def filter_argspec(func):
-            return filter(
-                inspect.signature(remove_decorators(func)))
+            return filter(_signature(remove_decorators(func)))
 
         def assert_same_argspec(expected, actual):
             if expected != actual:
@@ -0,0 +1 @@
+Added a database index on the builder and completion time of builds to speed up queries for running and recent builds of a builder. ``buildbot upgrade-master`` needs to be run to create it.
@@ -0,0 +1 @@
+Added ``buildbot.reporters.utils.getResponsibleUsersForSourceStamps`` to compute the blamelists of several sourcestamps with concurrent data API queries.